@@ -1,11 +1,25 @@
 # [cite: 68] Python
 import tkinter as tk
-from tkinter import ttk, messagebox # [cite: 125, 126, 127, 128, 129, 175] Import messagebox for error/info display
+from tkinter import ttk, messagebox, filedialog # [cite: 125, 126, 127, 128, 129, 175] Import messagebox for error/info display
+import os
 import networkx as nx
 import matplotlib
 matplotlib.use('TkAgg') # [cite: 68, 81] Set backend BEFORE importing pyplot
 from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk # [cite: 68, 82] Add NavigationToolbar2Tk if needed
+from algorithms import ALGORITHMS, AlgorithmInputError, validate_algorithm_inputs
+from pipeline import parse_graph, run_on_graph, result_weight
+from execution import ExecutionEngine
+from layout_cache import LayoutManager, LAYOUT_METHODS, LAYOUT_AUTO
+from shortest_paths import ShortestPathService
+from renderer import GraphRenderer, result_highlight
+from algorithm_steps import algorithm_steps
+from animation import AnimationScheduler, ANIMATION_SPEEDS, DEFAULT_STEPS_PER_SECOND
+from instrumentation import Instrumentation
+from stats_panel import StatsPanel
+from snapshot import save_snapshot, load_snapshot, SNAPSHOT_EXTENSION
+
+TEXT_LINES_PER_CHUNK = 50000 # Lines pulled from the Text widget per read while parsing
 
 class GraphVisualizerApp:
     # [cite: 68] def __init__(self, master):
@@ -26,7 +40,20 @@ class GraphVisualizerApp:
         # --- Initialize Graph and Plot --- # [cite: 68]
         self.graph = nx.Graph() # [cite: 68, 85] Or nx.DiGraph() if directed needed initially
         self.pos = None # [cite: 68, 157] To store node positions
+        self.layout_manager = LayoutManager() # Reuses/caches positions across edits and sessions
         self.edge_labels = {} # To store edge weights for drawing
+        self.graph_version = None # Fingerprint of self.graph; keys the layout and shortest-path caches
+        self.shortest_paths = ShortestPathService() # Keeps Dijkstra results between runs
+        self.parsed = None # pipeline.ParsedGraph behind self.graph (also holds its CSR copy for large graphs)
+        self.edge_file_path = None # Edge-list file to parse instead of the text box (set via "Load Edge File...")
+        self.snapshot_path = None # Binary snapshot used instead of either (set via "Open Snapshot...")
+        self.snapshot_graph = None # (ParsedGraph, pos) rebuilt from that snapshot, once ready
+        # Per-stage timings shown in the Stats panel; GRAPH_VISUALIZER_TRACE also appends them to a JSONL file
+        self.stats = Instrumentation(trace_path=os.environ.get("GRAPH_VISUALIZER_TRACE"))
+
+        # --- Background execution --- # Parsing, algorithms and layout run off the Tk main loop
+        self.engine = ExecutionEngine(master)
+        master.protocol("WM_DELETE_WINDOW", self.on_close)
 
         # --- Setup GUI elements --- # [cite: 68]
         self.setup_gui() # [cite: 68, 159]
@@ -50,12 +77,24 @@ class GraphVisualizerApp:
         text_scrollbar = ttk.Scrollbar(self.control_frame, orient=tk.VERTICAL, command=self.graph_input_text.yview) # [cite: 73]
         self.graph_input_text['yscrollcommand'] = text_scrollbar.set # [cite: 73]
         text_scrollbar.grid(row=1, column=1, sticky='ns', rowspan=4) # [cite: 73]
+        # Typing into the text box switches back from a loaded file to the typed edges
+        self.graph_input_text.bind("<<Modified>>", self.on_graph_text_modified)
+
+        # --- Edge File Input --- # Large edge lists are streamed from disk instead of pasted
+        file_frame = ttk.Frame(self.control_frame)
+        file_frame.grid(row=5, column=0, columnspan=2, padx=5, pady=2, sticky="ew")
+        ttk.Button(file_frame, text="Load Edge File...", command=self.choose_edge_file).pack(side=tk.LEFT)
+        # Snapshots store the parsed graph and its layout as arrays, so reopening skips parsing and layout
+        ttk.Button(file_frame, text="Open Snapshot...", command=self.open_snapshot).pack(side=tk.LEFT, padx=(5, 0))
+        ttk.Button(file_frame, text="Save Snapshot...", command=self.save_snapshot).pack(side=tk.LEFT, padx=(5, 0))
+        self.edge_file_label = ttk.Label(file_frame, text="Using text input")
+        self.edge_file_label.pack(side=tk.LEFT, padx=5)
 
         # --- Algorithm Selection --- # [cite: 74]
         ttk.Label(self.control_frame, text="Select Algorithm:").grid(row=0, column=2, sticky=tk.W, padx=5, pady=2) # [cite: 75]
         self.algorithm_var = tk.StringVar()
         # [cite: 5] Algorithm list
-        algo_list = ["BFS", "DFS", "Dijkstra", "Kruskal", "Prim"]
+        algo_list = list(ALGORITHMS)
         self.algorithm_combobox = ttk.Combobox(self.control_frame, # [cite: 74]
                                                textvariable=self.algorithm_var,
                                                values=algo_list, # [cite: 76]
@@ -78,15 +117,50 @@ class GraphVisualizerApp:
                                      command=self.run_algorithm) # [cite: 79, 123] Links button to run_algorithm
         self.run_button.grid(row=4, column=2, columnspan=2, pady=10, padx=5, sticky="ew") # [cite: 79]
 
+        # --- Progress / Cancel --- # Shows what the background run is doing and lets the user abort it
+        progress_frame = ttk.Frame(self.control_frame)
+        progress_frame.grid(row=5, column=2, columnspan=2, padx=5, pady=2, sticky="ew")
+        self.status_label = ttk.Label(progress_frame, text="Ready", width=24)
+        self.status_label.pack(side=tk.LEFT)
+        self.progress_bar = ttk.Progressbar(progress_frame, mode='determinate', length=120, maximum=100)
+        self.progress_bar.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        self.cancel_button = ttk.Button(progress_frame, text="Cancel", command=self.cancel_run, state=tk.DISABLED)
+        self.cancel_button.pack(side=tk.LEFT)
+
+        # --- Layout Selection --- # Barnes-Hut handles graphs far beyond what spring_layout can
+        ttk.Label(self.control_frame, text="Layout:").grid(row=6, column=2, sticky=tk.W, padx=5, pady=2)
+        self.layout_var = tk.StringVar(value=LAYOUT_AUTO)
+        self.layout_combobox = ttk.Combobox(self.control_frame, textvariable=self.layout_var,
+                                            values=LAYOUT_METHODS, state='readonly')
+        self.layout_combobox.grid(row=6, column=3, padx=5, pady=2, sticky="ew")
+
+        # --- Animation --- # Optionally play the algorithm step by step before showing its result
+        animation_frame = ttk.Frame(self.control_frame)
+        animation_frame.grid(row=6, column=0, columnspan=2, padx=5, pady=2, sticky="ew")
+        self.animate_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(animation_frame, text="Animate steps", variable=self.animate_var).pack(side=tk.LEFT)
+        ttk.Label(animation_frame, text="Speed (steps/s):").pack(side=tk.LEFT, padx=(10, 2))
+        self.speed_var = tk.StringVar(value=str(DEFAULT_STEPS_PER_SECOND))
+        ttk.Combobox(animation_frame, textvariable=self.speed_var, values=[str(speed) for speed in ANIMATION_SPEEDS],
+                     state='readonly', width=7).pack(side=tk.LEFT)
+
+        # --- Stats --- # Collapsible table of where the last run spent its time and memory
+        self.stats_panel = StatsPanel(self.control_frame, self.stats)
+        self.stats_panel.grid(row=7, column=0, columnspan=4, padx=5, pady=2, sticky="ew")
+
     # [cite: 80] Setup method for Matplotlib canvas
     def setup_matplotlib_canvas(self):
         self.fig = Figure(figsize=(7, 6), dpi=100) # [cite: 80] Create Matplotlib Figure
         self.ax = self.fig.add_subplot(111) # [cite: 80, 81] Add Axes
         self.ax.set_title("Graph Visualization") # [cite: 80]
         self.ax.axis('off') # [cite: 80] Hide axes ticks/spines initially
+        self.renderer = GraphRenderer(self.ax) # Owns the node/edge collections drawn on self.ax
 
         self.canvas = FigureCanvasTkAgg(self.fig, master=self.vis_frame) # [cite: 80, 82] Create Tkinter Canvas
         self.canvas_widget = self.canvas.get_tk_widget() # [cite: 82] Get the Tkinter-compatible widget
+        self.animator = AnimationScheduler(self.master, self.renderer, self.canvas) # Plays step-by-step runs
+        # Every real redraw (draw_idle ends up here too) is timed, with what was on the axes at the time
+        self.stats.wrap(self.canvas, 'draw', 'draw', self.renderer.artist_counts)
         # [cite: 82] Pack or grid this widget into the vis_frame
         self.canvas_widget.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
 
@@ -97,225 +171,360 @@ class GraphVisualizerApp:
 
         self.canvas.draw() # [cite: 80, 82] Initial draw (often blank)
 
+    # Let the user pick an edge-list file; it is parsed in place of the text box on the next run
+    def choose_edge_file(self):
+        path = filedialog.askopenfilename(title="Open Edge List",
+                                          filetypes=[("Edge lists", "*.txt *.edges *.csv"), ("All files", "*.*")])
+        if not path:
+            return
+        self.edge_file_path = path
+        self.snapshot_path = None
+        self.snapshot_graph = None
+        self.edge_file_label.config(text=f"Using file: {os.path.basename(path)}")
+
+    def on_graph_text_modified(self, event=None):
+        if self.graph_input_text.edit_modified():
+            self.graph_input_text.edit_modified(False) # Reset the flag so the next edit fires again
+            if self.edge_file_path is not None or self.snapshot_path is not None:
+                self.edge_file_path = None
+                self.snapshot_path = None
+                self.snapshot_graph = None
+                self.edge_file_label.config(text="Using text input")
+
+    # Yield the Text widget contents a block of lines at a time instead of one giant string
+    def iter_graph_text_chunks(self, lines_per_chunk=TEXT_LINES_PER_CHUNK):
+        last_line = int(self.graph_input_text.index('end-1c').split('.')[0])
+        for start in range(1, last_line + 1, lines_per_chunk):
+            yield self.graph_input_text.get(f"{start}.0", f"{start + lines_per_chunk}.0")
+
     # [cite: 91] Parsing method called by run_algorithm.
-    def parse_graph_input(self): # [cite: 92]
-        self.graph.clear() # [cite: 92, 161] Clear previous graph data
-        self.edge_labels.clear() # Clear previous edge labels
-        graph_data_string = self.graph_input_text.get("1.0", tk.END) # [cite: 92]
-        lines = graph_data_string.strip().split('\n') # [cite: 92]
-        edges_to_add = [] # [cite: 92]
-        has_weights = False # [cite: 92] Flag to track if any weights are provided
-
-        for line_num, line in enumerate(lines): # [cite: 92]
-            parts = line.strip().split() # [cite: 92]
-            if not parts:
-                continue # Skip empty lines [cite: 92]
-
-            try: # [cite: 96] Use a try-except block
-                if len(parts) == 2: # [cite: 95] Parse unweighted edges
-                    u, v = parts
-                    edges_to_add.append((u, v)) # [cite: 92]
-                elif len(parts) == 3: # [cite: 95] Parse weighted edges
-                    u, v, weight_str = parts # [cite: 93]
-                    weight = float(weight_str) # [cite: 93, 97] Convert weight to float
-                    edges_to_add.append((u, v, {'weight': weight})) # [cite: 93] Add edge with weight attribute
-                    self.edge_labels[(u,v)] = weight # Store for drawing
-                    has_weights = True # [cite: 93]
-                else:
-                    # Handle incorrect format for this line [cite: 93]
-                    print(f"Warning: Skipping malformed line {line_num+1}: '{line}'") # [cite: 93]
-                    # Optionally show error to user via messagebox [cite: 93]
-                    messagebox.showwarning("Parsing Warning", f"Skipping malformed line {line_num+1}: '{line}'.\nExpected format: u v [weight]")
-                    continue
-            except ValueError: # [cite: 97] Handle non-numeric weight
-                 print(f"Warning: Skipping line {line_num+1} due to non-numeric weight: '{line}'") # [cite: 93]
-                 messagebox.showwarning("Parsing Warning", f"Skipping line {line_num+1} due to non-numeric weight: '{line}'.")
-                 continue
-            except Exception as e: # [cite: 93]
-                 print(f"Error parsing line {line_num+1}: {e}") # [cite: 93]
-                 messagebox.showerror("Parsing Error", f"Error parsing line {line_num+1}: {e}")
-                 return False # [cite: 93] Indicate parsing failure
-
-        # Add edges to the graph
-        try:
-            # add_edges_from handles the attribute dict correctly [cite: 94]
-            self.graph.add_edges_from(edges_to_add) # [cite: 94, 98]
-            # Nodes are added automatically when edges are added [cite: 94, 99]
-            print(f"Graph parsed: {self.graph.number_of_nodes()} nodes, {self.graph.number_of_edges()} edges.") # [cite: 94]
-            return True # [cite: 94, 100] Indicate parsing success
-        except Exception as e:
-            print(f"Error adding edges to graph: {e}") # [cite: 94]
-            messagebox.showerror("Graph Error", f"Error adding edges to graph: {e}") # [cite: 94]
-            return False # [cite: 94, 100] Indicate parsing failure
+    # Runs on a worker thread: builds a fresh graph instead of touching self.graph or any widget.
+    # The parsing itself lives in pipeline.py so batch.py can use it without Tk.
+    def parse_graph_input(self, edge_file_path, graph_chunks, ctx=None): # [cite: 92]
+        return parse_graph(edge_file_path, graph_chunks, ctx.progress if ctx is not None else None,
+                           stage=self.stats.stage, check_cancelled=ctx.check_cancelled if ctx is not None else None)
+
+    # --- Snapshots --- #
+    # Map the snapshot and prepare its drawing arrays on a worker, draw them straight away,
+    # then rebuild the networkx graph in the background
+    def open_snapshot(self):
+        path = filedialog.askopenfilename(title="Open Graph Snapshot",
+                                          filetypes=[("Graph snapshots", f"*{SNAPSHOT_EXTENSION}"), ("All files", "*.*")])
+        if not path:
+            return
+        self.start_run()
+        self.stats.begin_run(snapshot=os.path.basename(path))
+        self.engine.submit(lambda ctx: self.prepare_snapshot(path, ctx),
+                           on_done=lambda snapshot: self.on_snapshot_prepared(path, snapshot),
+                           on_error=self.on_open_snapshot_error,
+                           on_progress=self.on_run_progress)
+
+    # Runs on a worker thread: checking the file and building the edge arrays both walk every edge
+    def prepare_snapshot(self, path, ctx):
+        ctx.progress("Opening snapshot...")
+        with self.stats.stage("open snapshot") as details:
+            snapshot = load_snapshot(path)
+            details.update(nodes=snapshot.num_nodes, edges=snapshot.num_edges)
+        self.stats.annotate(nodes=snapshot.num_nodes, edges=snapshot.num_edges)
+        if snapshot.xy is not None:
+            with self.stats.stage("snapshot draw arrays"):
+                snapshot.draw_arrays() # Cached on the snapshot for on_snapshot_prepared
+        return snapshot
+
+    def on_snapshot_prepared(self, path, snapshot):
+        self.edge_file_path = None
+        self.snapshot_path = path
+        self.snapshot_graph = None
+        self.edge_file_label.config(text=f"Using snapshot: {os.path.basename(path)}")
+        drawn = snapshot.xy is not None
+        if drawn:
+            with self.stats.stage("draw arrays") as details:
+                self.renderer.set_arrays(snapshot.draw_arrays(), snapshot.xy)
+                details.update(self.renderer.artist_counts())
+            self.ax.set_title(f"Graph Visualization: {os.path.basename(path)}")
+            self.canvas.draw_idle()
+        layout_method = self.layout_var.get()
+        self.engine.submit(lambda ctx: self.load_snapshot_graph(snapshot, layout_method, ctx),
+                           on_done=lambda outcome: self.on_snapshot_opened(outcome, drawn),
+                           on_error=self.on_snapshot_error,
+                           on_progress=self.on_run_progress)
+
+    # Runs on a worker thread: the graph the algorithms need, plus positions (laid out only if none were saved)
+    def load_snapshot_graph(self, snapshot, layout_method, ctx):
+        ctx.progress("Rebuilding graph from snapshot...")
+        with self.stats.stage("snapshot graph") as details:
+            parsed = snapshot.to_parsed(ctx.check_cancelled)
+            details.update(nodes=parsed.graph.number_of_nodes(), edges=parsed.graph.number_of_edges())
+        pos = snapshot.positions()
+        if pos is None:
+            ctx.progress("Computing layout...")
+            with self.stats.stage("layout", method=layout_method, seeded=False):
+                pos = self.compute_layout(parsed.graph, None, layout_method, parsed.version)
+        parsed.draw_arrays.positions(pos) # Ready for drawing, see algorithm_job
+        return parsed, pos
+
+    def on_snapshot_loaded(self, outcome):
+        parsed, pos = outcome
+        self.snapshot_graph = outcome
+        self.parsed = parsed
+        self.graph = parsed.graph
+        self.graph_version = parsed.version
+        self.edge_labels = parsed.edge_labels
+        self.pos = pos
+        # The saved layout is this graph's layout from now on (no warm-start on the next run)
+        self.layout_manager.adopt(self.graph, pos, self.layout_var.get(), self.graph_version)
+
+    def on_snapshot_opened(self, outcome, drawn):
+        self.on_snapshot_loaded(outcome)
+        if drawn:
+            self.renderer.attach_graph(self.graph, self.pos) # Already on screen; later redraws only restyle
+        else:
+            self.update_visualization()
+        self.finish_run("Snapshot loaded")
+
+    def on_open_snapshot_error(self, e):
+        messagebox.showerror("Snapshot Error", f"Could not open snapshot: {e}")
+        self.finish_run("Snapshot not opened")
+
+    def on_snapshot_error(self, e):
+        print(f"Snapshot Error: {e}")
+        messagebox.showerror("Snapshot Error", f"Snapshot failed: {e}")
+        self.finish_run("Snapshot failed")
+
+    def save_snapshot(self):
+        if self.parsed is None or not self.graph:
+            messagebox.showinfo("Save Snapshot", "Run an algorithm first: the snapshot stores the graph and layout it used.")
+            return
+        path = filedialog.asksaveasfilename(title="Save Graph Snapshot", defaultextension=SNAPSHOT_EXTENSION,
+                                            filetypes=[("Graph snapshots", f"*{SNAPSHOT_EXTENSION}"), ("All files", "*.*")])
+        if not path:
+            return
+        parsed, pos = self.parsed, self.pos
+
+        def save_job(ctx):
+            ctx.progress("Saving snapshot...")
+            with self.stats.stage("save snapshot"):
+                save_snapshot(path, parsed, pos)
+
+        self.start_run()
+        self.engine.submit(save_job,
+                           on_done=lambda _: self.finish_run(f"Saved {os.path.basename(path)}"),
+                           on_error=self.on_snapshot_error,
+                           on_progress=self.on_run_progress)
 
     # [cite: 123] Central coordinator method linked to the button
     # [cite: 162] Orchestrates getting user input, calling parse_graph_input, executing algorithm...
+    # The heavy stages are chained on the execution engine; each step's callback runs back on the Tk thread.
     def run_algorithm(self): # [cite: 124]
         # 1. Get user selections # [cite: 124]
         selected_algo = self.algorithm_var.get() # [cite: 124]
         source_node = self.source_entry.get().strip() # [cite: 124]
         target_node = self.target_entry.get().strip() # [cite: 124]
-
-        # 2. Parse graph data # [cite: 124]
-        if not self.parse_graph_input(): # [cite: 124]
-            # Parsing failed, error message already shown in parse_graph_input
-            # tk.messagebox.showerror("Error", "Failed to parse graph input. Please check format.") # [cite: 124] Handled in parser
-            self.update_visualization() # Update viz to show potentially cleared graph
-            return # [cite: 124]
+        layout_method = self.layout_var.get()
+
+        # 2. Parse graph data (in the background) # [cite: 124]
+        # Snapshot the input here: Tk widgets must not be read from a worker thread
+        edge_file_path = self.edge_file_path
+        graph_chunks = None if edge_file_path is not None else list(self.iter_graph_text_chunks())
+        self.start_run()
+        self.stats.begin_run(algorithm=selected_algo, source=source_node, target=target_node, layout=layout_method)
+        if self.snapshot_path is not None:
+            # Nothing to parse: reuse the graph rebuilt from the snapshot (or rebuild it if that is still running)
+            snapshot_path = self.snapshot_path
+            loaded = self.snapshot_graph
+            self.engine.submit(lambda ctx: loaded or self.load_snapshot_graph(load_snapshot(snapshot_path), layout_method, ctx),
+                               on_done=lambda outcome: self.on_snapshot_run(outcome, selected_algo, source_node, target_node, layout_method),
+                               on_error=self.on_snapshot_error,
+                               on_progress=self.on_run_progress)
+            return
+        self.engine.submit(lambda ctx: self.parse_graph_input(edge_file_path, graph_chunks, ctx),
+                           on_done=lambda parsed: self.on_graph_parsed(parsed, selected_algo, source_node, target_node, layout_method),
+                           on_error=self.on_parse_error,
+                           on_progress=self.on_run_progress)
+
+    def on_snapshot_run(self, outcome, selected_algo, source_node, target_node, layout_method):
+        self.on_snapshot_loaded(outcome)
+        self.on_graph_parsed(outcome[0], selected_algo, source_node, target_node, layout_method)
+
+    def on_parse_error(self, e):
+        print(f"Error parsing graph: {e}")
+        messagebox.showerror("Parsing Error", f"Could not parse graph input: {e}")
+        self.graph = nx.Graph()
+        self.parsed = None
+        self.graph_version = None
+        self.edge_labels = {}
+        self.update_visualization() # Update viz to show the cleared graph
+        self.finish_run("Parsing failed")
+
+    def on_graph_parsed(self, parsed, selected_algo, source_node, target_node, layout_method=LAYOUT_AUTO):
+        report = parsed.report
+        # One summary for every skipped line instead of a dialog per line
+        if report:
+            print(f"Warning: {report.summary()}")
+            messagebox.showwarning("Parsing Warning", report.summary())
+        self.parsed = parsed
+        self.graph = parsed.graph
+        self.graph_version = parsed.version
+        self.edge_labels = parsed.edge_labels
+        print(f"Graph parsed: {self.graph.number_of_nodes()} nodes, {self.graph.number_of_edges()} edges.") # [cite: 94]
+        self.stats.annotate(nodes=self.graph.number_of_nodes(), edges=self.graph.number_of_edges())
 
         # Check if graph is empty # [cite: 124]
         if not self.graph: # [cite: 124]
             tk.messagebox.showwarning("Warning", "Graph is empty. Please enter graph data.") # [cite: 124]
             self.update_visualization() # Update viz to show empty state
+            self.finish_run("Graph is empty")
             return # [cite: 124]
 
-        # 3. Validate inputs (basic example) # [cite: 125]
-        if selected_algo in ["BFS", "DFS", "Dijkstra", "Prim"] and not source_node: # [cite: 125] (Prim also often needs a source)
-             tk.messagebox.showerror("Input Error", f"Source node required for {selected_algo}.") # [cite: 125]
-             return # [cite: 126]
-
-        if selected_algo == "Dijkstra" and not target_node: # [cite: 126]
-             tk.messagebox.showerror("Input Error", f"Target node required for {selected_algo}.") # [cite: 126]
-             return # [cite: 126]
-
-        # Validate if nodes exist in the graph [cite: 129]
-        if source_node and source_node not in self.graph: # [cite: 126]
-             tk.messagebox.showerror("Input Error", f"Source node '{source_node}' not found in graph.") # [cite: 126]
-             return # [cite: 126]
-
-        if target_node and target_node not in self.graph: # [cite: 126]
-             tk.messagebox.showerror("Input Error", f"Target node '{target_node}' not found in graph.") # [cite: 126]
-             return # [cite: 126]
-
-        # Check if graph is connected for algorithms that need it (optional, can be complex)
-
-        # 4. Execute selected algorithm # [cite: 126]
-        results = None
-        try: # [cite: 129] Use try-except for algorithm execution
-            if selected_algo == "BFS": # [cite: 126]
-                # [cite: 112] To get the edges traversed: edges = list(nx.bfs_edges(self.graph, source=start_node))
-                results = list(nx.bfs_edges(self.graph, source=source_node)) # [cite: 126]
-            elif selected_algo == "DFS": # [cite: 126]
-                # [cite: 114] To get the edges traversed: edges = list(nx.dfs_edges(self.graph, source=start_node))
-                results = list(nx.dfs_edges(self.graph, source=source_node)) # [cite: 126]
-            elif selected_algo == "Dijkstra": # [cite: 126]
-                # Ensure graph has weights or handle appropriately # [cite: 126] Check if 'weight' attribute exists needed
-                results = nx.dijkstra_path(self.graph, source=source_node, target=target_node, weight='weight') # [cite: 116, 126]
-            elif selected_algo == "Kruskal": # [cite: 126]
-                # Ensure graph is undirected and has weights # [cite: 126] nx.Graph handles undirected
-                # [cite: 118] Get MST edges directly: mst_edges = list(nx.minimum_spanning_edges(...))
-                results = list(nx.minimum_spanning_edges(self.graph, algorithm='kruskal', weight='weight', data=False)) # [cite: 118, 126]
-            elif selected_algo == "Prim": # [cite: 126]
-                # Ensure graph is undirected and has weights # [cite: 126]
-                # Prim needs a starting node if graph is not connected, but minimum_spanning_edges handles this. [cite: 127]
-                # We pass the user source_node to the algorithm, which might be used as starting point internally if graph disconnected
-                results = list(nx.minimum_spanning_edges(self.graph, algorithm='prim', weight='weight', data=False, ignore_nan=True)) # Added ignore_nan, specify source if needed for disconnected behavior
-                # Note: NetworkX's Prim implementation (via minimum_spanning_edges) doesn't directly take a start node parameter in the same way as some textbook algorithms.
-                # It typically finds the MST for the component containing an arbitrary node if the graph is disconnected.
-                # For visualizing Prim's *process* from a specific node, a step-by-step implementation would be needed. [cite: 177]
-            else:
-                tk.messagebox.showwarning("Warning", f"Algorithm '{selected_algo}' selection not recognized or not yet implemented.") # [cite: 127]
-                return
-
-        except nx.NetworkXNoPath: # [cite: 127, 129] Handle no path error
+        # 3. Validate inputs # [cite: 125]
+        try:
+            validate_algorithm_inputs(self.graph, selected_algo, source_node, target_node) # [cite: 125, 126, 129]
+        except AlgorithmInputError as e:
+            tk.messagebox.showerror("Input Error", str(e)) # [cite: 125]
+            self.finish_run("Input error")
+            return # [cite: 126]
+
+        # 4. Execute selected algorithm and compute the layout (in the background) # [cite: 126]
+        parsed = self.parsed
+        graph = self.graph
+        graph_version = self.graph_version
+        prev_pos = self.pos
+
+        def algorithm_job(ctx):
+            ctx.progress(f"Running {selected_algo}...")
+            try:
+                # Dijkstra is answered from (or stored in) the shortest-path cache; the title reads the length back
+                # from it.
+                with self.stats.stage(f"algorithm ({selected_algo})",
+                                      backend="csr" if parsed.csr is not None else "networkx") as details:
+                    results = run_on_graph(parsed, selected_algo, source_node, target_node, ctx.check_cancelled,
+                                           self.shortest_paths)
+                    details['result_size'] = len(results)
+                no_path = False
+            except nx.NetworkXNoPath: # [cite: 127, 129] Still lay out the graph to show it without a path
+                results = None
+                no_path = True
+            ctx.progress("Computing layout...")
+            with self.stats.stage("layout", method=layout_method, seeded=prev_pos is not None):
+                pos = self.compute_layout(graph, prev_pos, layout_method, graph_version)
+            # Node/edge arrays and positions for the renderer, prepared here rather than on the Tk thread
+            with self.stats.stage("draw arrays"):
+                parsed.draw_arrays.positions(pos)
+            return results, no_path, pos
+
+        self.engine.submit(algorithm_job,
+                           on_done=lambda outcome: self.on_algorithm_done(outcome, selected_algo, source_node, target_node),
+                           on_error=self.on_algorithm_error,
+                           on_progress=self.on_run_progress)
+
+    def on_algorithm_done(self, outcome, selected_algo, source_node, target_node):
+        results, no_path, pos = outcome
+        self.pos = pos
+        if self.animate_var.get():
+            # Draw the plain graph, replay the algorithm's steps on it, then show the result as usual
+            self.update_visualization()
+            self.ax.set_title(f"Graph Visualization: {selected_algo} (step by step)")
+            self.on_run_progress(f"Animating {selected_algo}...")
+            steps = algorithm_steps(self.graph, selected_algo, source_node or None, target_node or None)
+            self.animator.start(steps, selected_algo, int(self.speed_var.get()), source_node, target_node,
+                                on_finished=lambda: self.show_result(results, no_path, selected_algo, source_node, target_node))
+            return
+        self.show_result(results, no_path, selected_algo, source_node, target_node)
+
+    def show_result(self, results, no_path, selected_algo, source_node, target_node):
+        self.on_run_progress("Drawing...")
+        if no_path:
             tk.messagebox.showinfo("Info", f"No path found between {source_node} and {target_node}.") # [cite: 127]
-            # Still update visualization to show the base graph
-            self.update_visualization(algorithm_results=None, algorithm_name=selected_algo) # [cite: 128] Show graph without path
-            return # [cite: 128]
-        except nx.NodeNotFound as e: # [cite: 128, 129] Handle missing node error during algorithm run
+        # 5. Update visualization # [cite: 129]
+        self.update_visualization(algorithm_results=results, algorithm_name=selected_algo, # [cite: 129, 162] Trigger visualization update
+                                  source_node=source_node, target_node=target_node)
+        self.finish_run("Done")
+
+    def on_algorithm_error(self, e):
+        if isinstance(e, nx.NodeNotFound): # [cite: 128, 129] Handle missing node error during algorithm run
             tk.messagebox.showerror("Algorithm Error", f"Node not found during algorithm execution: {e}") # [cite: 128]
-            return # [cite: 128]
-        except nx.NetworkXError as e: # Catch other NetworkX specific errors (e.g., weight missing)
+        elif isinstance(e, AlgorithmInputError):
+            tk.messagebox.showwarning("Warning", str(e)) # [cite: 127]
+        elif isinstance(e, nx.NetworkXError): # Catch other NetworkX specific errors (e.g., weight missing)
             tk.messagebox.showerror("Algorithm Error", f"NetworkX algorithm error: {e}\nCheck if weights are provided for weighted algorithms.")
             print(f"Algorithm Error: {e}")
-            return
-        except Exception as e: # [cite: 128] Catch generic errors
+        else: # [cite: 128] Catch generic errors
             tk.messagebox.showerror("Error", f"Algorithm execution failed: {e}") # [cite: 128]
             print(f"Algorithm Error: {e}") # [cite: 128]
-            return # [cite: 128]
-
-        # 5. Update visualization # [cite: 129]
-        self.update_visualization(algorithm_results=results, algorithm_name=selected_algo) # [cite: 129, 162] Trigger visualization update
-
+        self.finish_run("Algorithm failed")
+
+    # --- Run status helpers --- # Always called on the Tk main thread
+    def start_run(self):
+        self.animator.stop()
+        self.cancel_button.config(state=tk.NORMAL)
+        self.on_run_progress("Starting...")
+
+    def on_run_progress(self, message, fraction=None):
+        self.status_label.config(text=message)
+        if fraction is None:
+            if str(self.progress_bar['mode']) != 'indeterminate':
+                self.progress_bar.config(mode='indeterminate')
+                self.progress_bar.start(15)
+        else:
+            self.progress_bar.stop()
+            self.progress_bar.config(mode='determinate', value=fraction * 100)
+
+    def finish_run(self, message):
+        self.progress_bar.stop()
+        self.progress_bar.config(mode='determinate', value=0)
+        self.status_label.config(text=message)
+        self.cancel_button.config(state=tk.DISABLED)
+
+    def cancel_run(self):
+        self.engine.cancel() # Any result still in flight is dropped when it arrives
+        self.animator.stop() # Leaves the animation where it was
+        self.finish_run("Cancelled")
+
+    def on_close(self):
+        self.animator.stop()
+        self.engine.shutdown()
+        self.stats.close()
+        self.master.destroy()
+
+    # Positions for graph, seeded from prev_pos; the fallback chain lives in LayoutManager.
+    # Runs on a worker thread, so it only reads its arguments.
+    def compute_layout(self, graph, prev_pos=None, method=LAYOUT_AUTO, fingerprint=None):
+        return self.layout_manager.layout(graph, prev_pos, method, fingerprint)
 
     # [cite: 130] Responsible for redrawing the graph
     # [cite: 163] Responsible for the redraw cycle: clearing the axes... drawing... highlighting... refreshing...
-    def update_visualization(self, algorithm_results=None, algorithm_name=None): # [cite: 131]
-        # 1. Clear previous drawing # [cite: 131]
-        self.ax.cla() # [cite: 131, 137, 163] Clear the axes
-
+    # source_node/target_node are the ones a result was computed for; by default the entries' current text
+    def update_visualization(self, algorithm_results=None, algorithm_name=None, source_node=None, target_node=None): # [cite: 131]
+        # 1. Empty graph: drop the old artists # [cite: 131]
         if not self.graph or self.graph.number_of_nodes() == 0: # [cite: 131] If graph is empty after clearing/parsing failure
+            self.renderer.clear() # [cite: 131, 137, 163] Clear the axes
             self.ax.set_title("Graph Visualization (No Data)") # [cite: 131]
-            self.ax.axis('off') # [cite: 131]
-            self.canvas.draw() # [cite: 131, 136, 163] Refresh canvas
+            self.canvas.draw_idle() # [cite: 131, 136, 163] Refresh canvas
             return # [cite: 132]
 
         # 2. Calculate layout (or reuse if desired) # [cite: 132]
-        # Recalculate each time unless self.pos is explicitly managed
-        try: # [cite: 132]
-            # Use a seed for reproducibility [cite: 132, 139]
-            if self.pos is None or len(self.pos) != len(self.graph.nodes()): # Recalculate if graph changed significantly
-                 self.pos = nx.spring_layout(self.graph, seed=42) # [cite: 132, 138]
-        except Exception as e: # [cite: 132] Handle layout errors
-            print(f"Layout Error (Spring): {e}. Trying Kamada-Kawai.")
-            try: # [cite: 132] Fallback layout
-                self.pos = nx.kamada_kawai_layout(self.graph) # [cite: 132]
-            except Exception as e2: # [cite: 132] Final fallback
-                print(f"Fallback Layout Error (Kamada-Kawai): {e2}. Using random layout.") # [cite: 132]
-                self.pos = nx.random_layout(self.graph, seed=42) # [cite: 132]
+        # Normally already computed on the worker; only recomputed here if the node set changed since
+        if self.pos is None or len(self.pos) != len(self.graph) or any(node not in self.pos for node in self.graph):
+            self.pos = self.compute_layout(self.graph, self.pos, self.layout_var.get(), self.graph_version) # [cite: 132, 138]
 
         # 3. Draw base graph # [cite: 132, 140, 144]
-        node_colors = ['lightblue'] * len(self.graph.nodes())
-        # Optionally color source/target nodes differently in the base draw
-        source_node = self.source_entry.get().strip()
-        target_node = self.target_entry.get().strip()
-        node_list = list(self.graph.nodes())
-        if source_node in self.graph:
-             node_colors[node_list.index(source_node)] = 'lightgreen'
-        if target_node in self.graph:
-             node_colors[node_list.index(target_node)] = 'salmon'
-
-
-        nx.draw_networkx_nodes(self.graph, self.pos, ax=self.ax, node_size=500, node_color=node_colors, alpha=0.9) # [cite: 132, 140]
-        nx.draw_networkx_labels(self.graph, self.pos, ax=self.ax, font_size=10) # [cite: 132, 140]
-        nx.draw_networkx_edges(self.graph, self.pos, ax=self.ax, edge_color='gray', alpha=0.6, width=1.0) # [cite: 132, 140]
-        # Draw edge labels (weights) if they exist
-        if self.edge_labels:
-             nx.draw_networkx_edge_labels(self.graph, self.pos, edge_labels=self.edge_labels, ax=self.ax, font_size=8)
-
+        # Node/edge collections are only built when the graph or layout changed; otherwise they are restyled below
+        with self.stats.stage("set graph") as details:
+            arrays = self.parsed.draw_arrays if self.parsed is not None and self.parsed.graph is self.graph else None
+            self.renderer.set_graph(self.graph, self.pos, self.edge_labels, arrays)
+            details.update(self.renderer.artist_counts())
+        # Color source/target nodes differently in the base draw
+        # (a result keeps its own endpoints even if the entries were edited while it ran)
+        if source_node is None:
+            source_node = self.source_entry.get().strip()
+        if target_node is None:
+            target_node = self.target_entry.get().strip()
 
         # 4. Apply Highlighting based on results # [cite: 132, 141, 143]
-        highlight_edge_color = 'blue'
-        highlight_node_color = 'orange'
-        highlight_width = 2.5 # [cite: 134, 146]
-
-        if algorithm_results is not None: # [cite: 132] Check if results exist
-            if algorithm_name in ["BFS", "DFS"]: # [cite: 132, 148]
-                # Highlight traversed edges [cite: 132]
-                highlight_edge_color = 'blue'
-                nx.draw_networkx_edges(self.graph, self.pos, edgelist=algorithm_results, ax=self.ax,
-                                       edge_color=highlight_edge_color, width=highlight_width, alpha=0.8) # [cite: 132, 148]
-            elif algorithm_name == "Dijkstra": # [cite: 133, 148]
-                # Highlight path nodes and edges [cite: 133]
-                # algorithm_results is list of nodes [cite: 133, 149]
-                path_nodes = algorithm_results # [cite: 133]
-                # [cite: 133, 149] Derive the edges in the path: path_edges = list(zip(path_nodes, path_nodes[1:]))
-                path_edges = list(zip(path_nodes, path_nodes[1:])) # [cite: 133, 149]
-                highlight_edge_color = 'red' # [cite: 134, 150]
-                highlight_node_color = 'orange' # [cite: 133, 150]
-                # Highlight path nodes [cite: 133, 150]
-                nx.draw_networkx_nodes(self.graph, self.pos, nodelist=path_nodes, ax=self.ax,
-                                       node_color=highlight_node_color, node_size=600) # [cite: 133]
-                # Highlight path edges [cite: 134, 150]
-                nx.draw_networkx_edges(self.graph, self.pos, edgelist=path_edges, ax=self.ax,
-                                       edge_color=highlight_edge_color, width=highlight_width, alpha=0.8) # [cite: 134]
-            elif algorithm_name in ["Kruskal", "Prim"]: # [cite: 134, 152]
-                # Highlight MST edges [cite: 134]
-                # algorithm_results is list of edges [cite: 134, 152]
-                mst_edges = algorithm_results # [cite: 134]
-                highlight_edge_color = 'green' # [cite: 134, 152]
-                nx.draw_networkx_edges(self.graph, self.pos, edgelist=mst_edges, ax=self.ax,
-                                       edge_color=highlight_edge_color, width=highlight_width, style='solid', alpha=0.8) # [cite: 134, 152]
+        # BFS/DFS edges blue, Dijkstra path red with orange nodes, MST edges green (see renderer.result_highlight)
+        highlight = result_highlight(algorithm_name, algorithm_results)
+        with self.stats.stage("highlight"):
+            self.renderer.highlight(source=source_node, target=target_node, **highlight)
 
         # 5. Finalize plot appearance # [cite: 135]
         title = "Graph Visualization"
@@ -323,16 +532,14 @@ class GraphVisualizerApp:
             title += f": {algorithm_name} Result" # [cite: 135]
             if algorithm_results is not None:
                  if algorithm_name == "Dijkstra":
-                      # Add path length if available (NetworkX doesn't return it with path easily)
-                      try:
-                           length = nx.dijkstra_path_length(self.graph, source=self.source_entry.get().strip(), target=self.target_entry.get().strip(), weight='weight') # [cite: 117]
+                      # Path length from the shortest-path cache filled by the run (no second search)
+                      length = self.shortest_paths.cached_length(self.graph_version, source_node, target_node) # [cite: 117]
+                      if length is not None:
                            title += f" (Length: {length:.2f})"
-                      except: # Handle cases where length calculation might fail separately
-                           pass
                  elif algorithm_name in ["Kruskal", "Prim"]:
                       # Add total weight of MST
                       try:
-                           mst_weight = sum(self.graph[u][v].get('weight', 1) for u, v in mst_edges)
+                           mst_weight = result_weight(self.graph, algorithm_name, algorithm_results)
                            title += f" (Total Weight: {mst_weight:.2f})"
                       except:
                            pass
@@ -341,7 +548,7 @@ class GraphVisualizerApp:
         self.ax.axis('off') # [cite: 135] Ensure axes are off
 
         # 6. Refresh canvas # [cite: 136]
-        self.canvas.draw() # [cite: 136, 142, 163, 172] IMPORTANT: Update the embedded plot
+        self.canvas.draw_idle() # [cite: 136, 142, 163, 172] Coalesced redraw on the next idle cycle
 
 # --- Main execution --- # [cite: 69]
 if __name__ == "__main__": # [cite: 69]
@@ -0,0 +1,190 @@
+# Step-by-step versions of the visualizer's algorithms.
+# Each is a generator yielding small event tuples as it works, so the GUI can animate the
+# run (see animation.py) instead of only showing the final result:
+#   ('push', node)        node entered the frontier (queue / stack / heap)
+#   ('pop', node)         node left the frontier (visited, settled, or finished for DFS)
+#   ('tree_edge', u, v)   edge added to the BFS/DFS tree or Prim's spanning tree
+#   ('relax', u, v)       Dijkstra found a shorter route to v via u (v's previous parent edge is dropped)
+#   ('union', u, v)       Kruskal joined the components of u and v with this edge
+#   ('reject', u, v)      Kruskal/Prim skipped the edge because it would close a cycle
+#   ('path', nodes)       Dijkstra's final source-target path
+#   ('done',)             last event of every run
+# Traversal orders match the networkx functions used in algorithms.py.
+import heapq
+import math
+from itertools import count
+
+
+# Weight of an edge as the networkx algorithms see it (missing weight counts as 1)
+def _weight(data):
+    return data.get('weight', 1)
+
+
+def bfs_steps(graph, source):
+    visited = {source}
+    queue = [source]
+    yield ('push', source)
+    for u in queue: # The list grows while we iterate; it never shrinks, which is fine for one run
+        yield ('pop', u)
+        for v in graph[u]:
+            if v not in visited:
+                visited.add(v)
+                queue.append(v)
+                yield ('tree_edge', u, v)
+                yield ('push', v)
+    yield ('done',)
+
+
+# Iterative, like nx.dfs_edges, so deep graphs do not hit the recursion limit
+def dfs_steps(graph, source):
+    visited = {source}
+    stack = [(source, iter(graph[source]))]
+    yield ('push', source)
+    while stack:
+        parent, children = stack[-1]
+        for child in children:
+            if child not in visited:
+                visited.add(child)
+                stack.append((child, iter(graph[child])))
+                yield ('tree_edge', parent, child)
+                yield ('push', child)
+                break
+        else:
+            stack.pop()
+            yield ('pop', parent)
+    yield ('done',)
+
+
+# Binary-heap Dijkstra; stops as soon as target is settled (or explores everything when target is None)
+def dijkstra_steps(graph, source, target=None):
+    dist = {source: 0}
+    pred = {source: None}
+    settled = set()
+    tie = count() # Tie-breaker so the heap never compares nodes
+    heap = [(0, next(tie), source)]
+    yield ('push', source)
+    while heap:
+        d, _, u = heapq.heappop(heap)
+        if u in settled:
+            continue # Stale entry left behind by a later relaxation
+        settled.add(u)
+        yield ('pop', u)
+        if u == target:
+            path = [u]
+            while pred[path[-1]] is not None:
+                path.append(pred[path[-1]])
+            yield ('path', path[::-1])
+            break
+        for v, data in graph[u].items():
+            if v in settled:
+                continue
+            candidate = d + _weight(data)
+            if v not in dist or candidate < dist[v]:
+                dist[v] = candidate
+                pred[v] = u
+                heapq.heappush(heap, (candidate, next(tie), v))
+                yield ('relax', u, v)
+                yield ('push', v)
+    yield ('done',)
+
+
+# Union-find with path halving and union by size
+class _DisjointSet:
+    def __init__(self):
+        self.parent = {}
+        self.size = {}
+
+    def find(self, x):
+        parent = self.parent
+        if x not in parent:
+            parent[x] = x
+            self.size[x] = 1
+            return x
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    # Returns False when x and y were already connected
+    def union(self, x, y):
+        x, y = self.find(x), self.find(y)
+        if x == y:
+            return False
+        if self.size[x] < self.size[y]:
+            x, y = y, x
+        self.parent[y] = x
+        self.size[x] += self.size[y]
+        return True
+
+
+def kruskal_steps(graph):
+    # sorted() is stable, so equal weights keep edge order like nx.minimum_spanning_edges
+    edges = sorted(graph.edges(data=True), key=lambda edge: _weight(edge[2]))
+    components = _DisjointSet()
+    for u, v, data in edges:
+        if math.isnan(_weight(data)):
+            continue
+        if components.union(u, v):
+            yield ('union', u, v)
+        else:
+            yield ('reject', u, v)
+    yield ('done',)
+
+
+# Prim from source; once its component is spanned it continues from the next unvisited node,
+# so a disconnected graph yields a spanning forest like networkx does. NaN weights are ignored.
+def prim_steps(graph, source=None):
+    visited = set()
+    tie = count()
+    starts = iter(graph) if source is None else _with_first(source, graph)
+    for start in starts:
+        if start in visited:
+            continue
+        visited.add(start)
+        heap = []
+        yield ('pop', start)
+        _push_edges(graph, start, visited, heap, tie)
+        while heap:
+            _, _, u, v = heapq.heappop(heap)
+            if v in visited:
+                yield ('reject', u, v)
+                continue
+            visited.add(v)
+            yield ('tree_edge', u, v)
+            yield ('pop', v)
+            _push_edges(graph, v, visited, heap, tie)
+    yield ('done',)
+
+
+def _with_first(first, nodes):
+    yield first
+    yield from nodes
+
+
+def _push_edges(graph, u, visited, heap, tie):
+    for v, data in graph[u].items():
+        weight = _weight(data)
+        if v not in visited and not math.isnan(weight):
+            heapq.heappush(heap, (weight, next(tie), u, v))
+
+
+# Step generator for an algorithm name from algorithms.ALGORITHMS
+def algorithm_steps(graph, algorithm, source=None, target=None):
+    if algorithm == "BFS":
+        return bfs_steps(graph, source)
+    elif algorithm == "DFS":
+        return dfs_steps(graph, source)
+    elif algorithm == "Dijkstra":
+        return dijkstra_steps(graph, source, target)
+    elif algorithm == "Kruskal":
+        return kruskal_steps(graph)
+    elif algorithm == "Prim":
+        return prim_steps(graph, source)
+    raise ValueError(f"No step-by-step version of '{algorithm}'.")
+
+
+# Just the edges the run keeps (tree edges and Kruskal unions), in the order they were added
+def tree_edges(steps):
+    for event in steps:
+        if event[0] in ('tree_edge', 'union'):
+            yield event[1], event[2]
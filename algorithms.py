@@ -0,0 +1,96 @@
+# Algorithm dispatch for the visualizer, kept free of any Tk/widget access so it can
+# run on a worker thread (and be reused outside the GUI).
+import networkx as nx
+
+from algorithm_steps import prim_steps, tree_edges
+from csr_graph import CSRGraph
+
+ALGORITHMS = ["BFS", "DFS", "Dijkstra", "Kruskal", "Prim"]
+SOURCE_ALGORITHMS = ["BFS", "DFS", "Dijkstra", "Prim"] # Prim also often needs a source
+TARGET_ALGORITHMS = ["Dijkstra"]
+
+CANCEL_CHECK_INTERVAL = 4096 # Items pulled from a result generator between cancellation checks
+
+# Backends for run_graph_algorithm
+BACKEND_AUTO = "auto" # CSR when a frozen copy is supplied or the graph is large, networkx otherwise
+BACKEND_NETWORKX = "networkx"
+BACKEND_CSR = "csr"
+CSR_MIN_EDGES = 100000 # "auto" freezes graphs at least this big into CSR arrays
+
+
+# Raised for bad user input (missing/unknown source or target) before any algorithm runs
+class AlgorithmInputError(ValueError):
+    pass
+
+
+def validate_algorithm_inputs(graph, algorithm, source_node, target_node):
+    if algorithm not in ALGORITHMS:
+        raise AlgorithmInputError(f"Algorithm '{algorithm}' selection not recognized or not yet implemented.")
+    if algorithm in SOURCE_ALGORITHMS and not source_node:
+        raise AlgorithmInputError(f"Source node required for {algorithm}.")
+    if algorithm in TARGET_ALGORITHMS and not target_node:
+        raise AlgorithmInputError(f"Target node required for {algorithm}.")
+    # Validate if nodes exist in the graph
+    if source_node and source_node not in graph:
+        raise AlgorithmInputError(f"Source node '{source_node}' not found in graph.")
+    if target_node and target_node not in graph:
+        raise AlgorithmInputError(f"Target node '{target_node}' not found in graph.")
+
+
+# Drain a networkx edge generator, giving the caller a chance to abort between batches
+def _collect(edges, check_cancelled=None):
+    if check_cancelled is None:
+        return list(edges)
+    results = []
+    for i, edge in enumerate(edges, 1):
+        results.append(edge)
+        if i % CANCEL_CHECK_INTERVAL == 0:
+            check_cancelled()
+    return results
+
+
+# Run one algorithm and return what update_visualization expects:
+# a list of edges (BFS/DFS/Kruskal/Prim) or a list of path nodes (Dijkstra).
+# Raises nx.NetworkXNoPath / nx.NodeNotFound / nx.NetworkXError like the networkx calls it wraps.
+# csr is an optional CSRGraph of the same graph (e.g. built once when it was parsed).
+def run_graph_algorithm(graph, algorithm, source_node=None, target_node=None, check_cancelled=None,
+                        backend=BACKEND_AUTO, csr=None):
+    if use_csr(graph, backend, csr):
+        if csr is None:
+            csr = CSRGraph.from_networkx(graph)
+        return _run_csr(csr, algorithm, source_node, target_node, check_cancelled)
+    if algorithm == "BFS":
+        return _collect(nx.bfs_edges(graph, source=source_node), check_cancelled)
+    elif algorithm == "DFS":
+        return _collect(nx.dfs_edges(graph, source=source_node), check_cancelled)
+    elif algorithm == "Dijkstra":
+        return nx.dijkstra_path(graph, source=source_node, target=target_node, weight='weight')
+    elif algorithm == "Kruskal":
+        # NaN weights are skipped, as in the CSR backend and the step-by-step versions
+        return _collect(nx.minimum_spanning_edges(graph, algorithm='kruskal', weight='weight', data=False,
+                                                  ignore_nan=True), check_cancelled)
+    elif algorithm == "Prim":
+        # Grown from the chosen source (networkx would start from an arbitrary node), same edges as the animation
+        return _collect(tree_edges(prim_steps(graph, source_node)), check_cancelled)
+    raise AlgorithmInputError(f"Algorithm '{algorithm}' selection not recognized or not yet implemented.")
+
+
+def use_csr(graph, backend=BACKEND_AUTO, csr=None):
+    if backend == BACKEND_AUTO:
+        return csr is not None or graph.number_of_edges() >= CSR_MIN_EDGES
+    return backend == BACKEND_CSR
+
+
+def _run_csr(csr, algorithm, source_node, target_node, check_cancelled):
+    if algorithm == "BFS":
+        return csr.bfs_edges(source_node, check_cancelled)
+    elif algorithm == "DFS":
+        return csr.dfs_edges(source_node, check_cancelled)
+    elif algorithm == "Dijkstra":
+        _, pred = csr.dijkstra(source_node, target_node, check_cancelled)
+        return csr.path_to(pred, source_node, target_node)
+    elif algorithm == "Kruskal":
+        return csr.kruskal_edges(check_cancelled)
+    elif algorithm == "Prim":
+        return csr.prim_edges(source_node, check_cancelled)
+    raise AlgorithmInputError(f"Algorithm '{algorithm}' selection not recognized or not yet implemented.")
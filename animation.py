@@ -0,0 +1,121 @@
+# Plays the events of algorithm_steps.py on the renderer's persistent artists.
+# Frames are driven by master.after; each frame applies every event that is due at the chosen
+# rate, restyles the collections once and asks for one draw_idle(). When drawing takes longer
+# than a frame, the next frame simply covers more events, so playback keeps its pace instead
+# of falling behind (and the figure is never redrawn per step).
+import time
+
+FRAME_INTERVAL_MS = 40 # ~25 frames per second
+MAX_CATCH_UP_S = 0.5 # After a stall, at most this much playback time is applied in one frame
+DEFAULT_STEPS_PER_SECOND = 100
+ANIMATION_SPEEDS = [10, 100, 1000, 10000] # Steps per second offered in the GUI
+
+FRONTIER_COLOR = 'gold'
+VISITED_COLOR = 'orange'
+REJECTED_COLOR = 'lightcoral'
+PATH_NODE_COLOR = 'orange'
+# Same edge colors as the final result in update_visualization
+TREE_EDGE_COLORS = {"BFS": 'blue', "DFS": 'blue', "Dijkstra": 'red', "Kruskal": 'green', "Prim": 'green'}
+
+
+class AnimationScheduler:
+    def __init__(self, master, renderer, canvas):
+        self.master = master
+        self.renderer = renderer
+        self.canvas = canvas
+        self._events = None
+        self._after_id = None
+        self._on_finished = None
+
+    @property
+    def running(self):
+        return self._events is not None
+
+    # Play events (an iterator from algorithm_steps) for algorithm; on_finished() runs after the last frame.
+    # source/target keep their own colors throughout.
+    def start(self, events, algorithm, steps_per_second=DEFAULT_STEPS_PER_SECOND, source=None, target=None,
+              on_finished=None):
+        self.stop()
+        self._events = iter(events)
+        self._on_finished = on_finished
+        self._rate = float(steps_per_second)
+        self._tree_color = TREE_EDGE_COLORS.get(algorithm, 'blue')
+        self._fixed = {node for node in (source, target) if node}
+        self._parent = {} # Dijkstra: node -> its current tentative tree edge
+        self._budget = 0.0
+        self._last = time.perf_counter()
+        self.renderer.reset_style(source, target)
+        self._after_id = self.master.after(FRAME_INTERVAL_MS, self._frame)
+
+    # Stop without calling on_finished (cancel, new run, window closing)
+    def stop(self):
+        if self._after_id is not None:
+            self.master.after_cancel(self._after_id)
+        self._after_id = None
+        self._events = None
+        self._on_finished = None
+
+    def _frame(self):
+        self._after_id = None
+        now = time.perf_counter()
+        self._budget = min(self._budget + (now - self._last) * self._rate, self._rate * MAX_CATCH_UP_S + 1)
+        self._last = now
+        due = int(self._budget)
+        self._budget -= due
+        # Last style per element wins within a frame, then each color is applied as one batch
+        nodes, edges = {}, {}
+        finished = False
+        for _ in range(due):
+            event = next(self._events, ('done',))
+            if event[0] == 'done':
+                finished = True
+                break
+            self._apply(event, nodes, edges)
+        self._flush(nodes, edges)
+        self.canvas.draw_idle()
+        if finished:
+            on_finished = self._on_finished
+            self._events = None
+            self._on_finished = None
+            if on_finished is not None:
+                on_finished()
+        else:
+            self._after_id = self.master.after(FRAME_INTERVAL_MS, self._frame)
+
+    def _apply(self, event, nodes, edges):
+        kind = event[0]
+        if kind == 'push':
+            nodes[event[1]] = FRONTIER_COLOR
+        elif kind == 'pop':
+            nodes[event[1]] = VISITED_COLOR
+        elif kind in ('tree_edge', 'union'):
+            edges[event[1], event[2]] = self._tree_color
+        elif kind == 'reject':
+            edges[event[1], event[2]] = REJECTED_COLOR
+        elif kind == 'relax':
+            u, v = event[1], event[2]
+            previous = self._parent.get(v)
+            if previous is not None:
+                edges[previous] = None # Back to the base style: v found a shorter route
+            self._parent[v] = (u, v)
+            edges[u, v] = self._tree_color
+        elif kind == 'path':
+            path = event[1]
+            for edge in zip(path, path[1:]):
+                edges[edge] = self._tree_color
+            for node in path:
+                nodes[node] = PATH_NODE_COLOR
+
+    def _flush(self, nodes, edges):
+        by_color = {}
+        for node, color in nodes.items():
+            if node not in self._fixed:
+                by_color.setdefault(color, []).append(node)
+        for color, group in by_color.items():
+            self.renderer.style_nodes(group, color)
+        by_color = {}
+        for edge, color in edges.items():
+            by_color.setdefault(color, []).append(edge)
+        for color, group in by_color.items():
+            self.renderer.style_edges(group, color)
+        self.renderer.flush_style()
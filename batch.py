@@ -0,0 +1,174 @@
+# Headless batch mode: run algorithms over every edge-list file in a directory and stream
+# one JSON line per (file, algorithm) to stdout. Files are processed in parallel worker
+# processes; --render also saves a PNG of each result through Matplotlib's Agg backend.
+# Nothing here imports tkinter or the TkAgg backend, so it runs on servers without a display.
+#
+#   python batch.py graphs/ --algorithms BFS,Dijkstra --source A --target F --jobs 4 --render out/
+import argparse
+import fnmatch
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import networkx as nx
+
+from algorithms import ALGORITHMS, TARGET_ALGORITHMS, AlgorithmInputError, validate_algorithm_inputs
+from pipeline import parse_graph, run_on_graph, result_weight
+
+DEFAULT_PATTERN = "*.txt"
+RENDER_SIZE = (7, 6) # Inches, same figure size as the GUI
+RENDER_DPI = 100
+
+
+def _json_node(node):
+    return node if isinstance(node, (str, int, float)) else str(node)
+
+
+# One JSON-serialisable record for a finished (or failed) run
+def _record(path, algorithm, status, **fields):
+    return dict(file=path, algorithm=algorithm, status=status, **fields)
+
+
+# Worker-process entry point: parse path once and run every algorithm on it
+def process_file(path, algorithms, source_node=None, target_node=None, render_dir=None, summary_only=False):
+    start = time.perf_counter()
+    try:
+        parsed = parse_graph(edge_file_path=path)
+    except (OSError, UnicodeDecodeError) as e:
+        return [_record(path, algorithm, "error", error=f"Could not read graph: {e}") for algorithm in algorithms]
+    graph = parsed.graph
+    parse_seconds = time.perf_counter() - start
+    info = dict(nodes=graph.number_of_nodes(), edges=graph.number_of_edges(), parse_seconds=round(parse_seconds, 4))
+    if parsed.report:
+        info['warning'] = parsed.report.summary()
+    if graph.number_of_nodes() == 0:
+        return [_record(path, algorithm, "error", error="Graph is empty.", **info) for algorithm in algorithms]
+
+    # Without --source, traversals start from the first node in the file
+    source = source_node or next(iter(graph))
+    records = []
+    for algorithm in algorithms:
+        # --target only applies to the algorithms that use one (a BFS should not fail over it)
+        target = target_node if algorithm in TARGET_ALGORITHMS else None
+        fields = dict(info, source=_json_node(source))
+        if target:
+            fields['target'] = _json_node(target)
+        start = time.perf_counter()
+        try:
+            validate_algorithm_inputs(graph, algorithm, source, target)
+            results = run_on_graph(parsed, algorithm, source, target)
+        except AlgorithmInputError as e:
+            records.append(_record(path, algorithm, "error", error=str(e), **fields))
+            continue
+        except nx.NetworkXNoPath:
+            records.append(_record(path, algorithm, "no_path", seconds=round(time.perf_counter() - start, 4), **fields))
+            continue
+        except (nx.NetworkXException, ValueError) as e:
+            records.append(_record(path, algorithm, "error", error=f"{type(e).__name__}: {e}", **fields))
+            continue
+        fields['seconds'] = round(time.perf_counter() - start, 4)
+        weight = result_weight(graph, algorithm, results)
+        if weight is not None:
+            fields['weight'] = weight
+        fields['result_size'] = len(results)
+        if not summary_only:
+            if algorithm == "Dijkstra":
+                fields['result'] = [_json_node(node) for node in results]
+            else:
+                fields['result'] = [[_json_node(u), _json_node(v)] for u, v in results]
+        if render_dir is not None:
+            fields['image'] = render_result(parsed, algorithm, results, source, target, weight,
+                                            os.path.join(render_dir, _image_name(path, algorithm)))
+        records.append(_record(path, algorithm, "ok", **fields))
+    return records
+
+
+def _image_name(path, algorithm):
+    return f"{os.path.splitext(os.path.basename(path))[0]}-{algorithm.lower()}.png"
+
+
+# Draw one result into a PNG with the same renderer as the GUI, on an Agg canvas
+def render_result(parsed, algorithm, results, source_node, target_node, weight, image_path):
+    # Imported here so a plain batch run never loads Matplotlib's drawing machinery
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from layout_cache import LayoutManager
+    from renderer import GraphRenderer, result_highlight
+
+    pos = LayoutManager().layout(parsed.graph, fingerprint=parsed.version)
+    fig = Figure(figsize=RENDER_SIZE, dpi=RENDER_DPI)
+    FigureCanvasAgg(fig)
+    renderer = GraphRenderer(fig.add_subplot(111))
+    renderer.set_graph(parsed.graph, pos, parsed.edge_labels, parsed.draw_arrays)
+    renderer.highlight(source=source_node, target=target_node, **result_highlight(algorithm, results))
+    title = f"Graph Visualization: {algorithm} Result"
+    if weight is not None:
+        title += f" ({'Length' if algorithm == 'Dijkstra' else 'Total Weight'}: {weight:.2f})"
+    renderer.ax.set_title(title)
+    fig.savefig(image_path)
+    return image_path
+
+
+def find_graph_files(directory, pattern=DEFAULT_PATTERN):
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                  if fnmatch.fnmatch(name, pattern) and os.path.isfile(os.path.join(directory, name)))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run graph algorithms over a directory of edge-list files "
+                                                 "and print one JSON line per file and algorithm.")
+    parser.add_argument("directory", help="Directory containing edge-list files (u v [weight] per line)")
+    parser.add_argument("--algorithms",
+                        help=f"Comma-separated list from {', '.join(ALGORITHMS)} "
+                             f"(default: all, leaving out {', '.join(TARGET_ALGORITHMS)} without --target)")
+    parser.add_argument("--pattern", default=DEFAULT_PATTERN, help=f"File name pattern (default: {DEFAULT_PATTERN})")
+    parser.add_argument("--source", help="Source node (default: the first node of each file)")
+    parser.add_argument("--target", help=f"Target node (required for {', '.join(TARGET_ALGORITHMS)})")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Worker processes (default: CPU count)")
+    parser.add_argument("--render", metavar="DIR", help="Also save a PNG of every result into DIR")
+    parser.add_argument("--summary", action="store_true", help="Leave the result edges/path out of the output")
+    args = parser.parse_args(argv)
+    if args.algorithms is None:
+        args.algorithms = [name for name in ALGORITHMS if args.target or name not in TARGET_ALGORITHMS]
+    else:
+        args.algorithms = [name.strip() for name in args.algorithms.split(",") if name.strip()]
+    unknown = [name for name in args.algorithms if name not in ALGORITHMS]
+    if unknown:
+        parser.error(f"unknown algorithm(s): {', '.join(unknown)}")
+    # Checked here rather than per file, where every file would just report the same error
+    needs_target = [name for name in args.algorithms if name in TARGET_ALGORITHMS]
+    if needs_target and not args.target:
+        parser.error(f"--target is required for {', '.join(needs_target)}")
+    if not os.path.isdir(args.directory):
+        parser.error(f"not a directory: {args.directory}")
+    return args
+
+
+# Returns the exit status: 0 if every run finished (a missing path counts as finished), 1 otherwise
+def main(argv=None, out=sys.stdout):
+    args = parse_args(argv)
+    files = find_graph_files(args.directory, args.pattern)
+    if args.render:
+        os.makedirs(args.render, exist_ok=True)
+    failed = False
+    with ProcessPoolExecutor(max_workers=max(1, args.jobs)) as executor:
+        futures = {executor.submit(process_file, path, args.algorithms, args.source, args.target, args.render,
+                                   args.summary): path for path in files}
+        # Streamed as files finish, not in directory order
+        for future in as_completed(futures):
+            try:
+                records = future.result()
+            except Exception as e: # Worker crashed (e.g. out of memory)
+                records = [_record(futures[future], algorithm, "error", error=f"{type(e).__name__}: {e}")
+                           for algorithm in args.algorithms]
+            for record in records:
+                failed |= record['status'] == "error"
+                out.write(json.dumps(record) + "\n")
+            out.flush()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,303 @@
+# Benchmark harness: generates reproducible graphs, times every stage the visualizer runs
+# (parse, graph build, CSR freeze, fingerprint, each algorithm, layout, headless render) and
+# records each stage's peak traced memory. Results are written as JSON and can be compared
+# against a saved baseline; the exit status is 1 when a stage regressed.
+#
+#   python benchmark.py --output bench.json                      # full run, 1e2..1e6 edges
+#   python benchmark.py --sizes 1e2,1e3,1e4 --baseline bench.json # check a change against it
+import argparse
+import json
+import math
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import networkx as nx
+import numpy as np
+
+from graph_loader import load_edge_text
+from algorithms import ALGORITHMS, run_graph_algorithm, use_csr
+from csr_graph import CSRGraph
+from layout_cache import LayoutManager, graph_fingerprint
+
+DEFAULT_SIZES = [100, 1000, 10000, 100000, 1000000] # Target edge counts
+DEFAULT_SEED = 0
+LAYOUT_MAX_EDGES = 200000 # Layout (and so rendering) is skipped above this many edges
+RENDER_MAX_EDGES = 200000 # Rendering alone is skipped above this many edges
+DEFAULT_TOLERANCE = 0.25 # A stage regressed if it got this much slower (fraction) ...
+MIN_REGRESSION_SECONDS = 0.05 # ... and by at least this long, so timer noise on tiny stages is ignored
+MAX_WEIGHT = 100
+
+
+# --- Graph generators --- # Each returns edge-list text in the input format (u v [weight]),
+# so the parser is measured on the same kind of input the GUI reads
+def _format_edges(src, dst, weights=None):
+    if weights is None:
+        return "\n".join(f"{u} {v}" for u, v in zip(src.tolist(), dst.tolist()))
+    return "\n".join(f"{u} {v} {w}" for u, v, w in zip(src.tolist(), dst.tolist(), weights.tolist()))
+
+
+def _random_pairs(rng, num_nodes, num_edges):
+    src = rng.integers(0, num_nodes, num_edges)
+    dst = rng.integers(0, num_nodes, num_edges)
+    keep = src != dst # Self-loops would only add noise; duplicate pairs collapse when the graph is built
+    return src[keep], dst[keep]
+
+
+# Uniform random graph, average degree ~8
+def random_graph(num_edges, rng):
+    return _format_edges(*_random_pairs(rng, max(2, num_edges // 4), num_edges))
+
+
+# Square 2D grid with about num_edges edges
+def grid_graph(num_edges, rng):
+    side = max(2, math.ceil(math.sqrt(num_edges / 2)))
+    ids = np.arange(side * side).reshape(side, side)
+    src = np.concatenate([ids[:, :-1].ravel(), ids[:-1, :].ravel()])
+    dst = np.concatenate([ids[:, 1:].ravel(), ids[1:, :].ravel()])
+    return _format_edges(src[:num_edges], dst[:num_edges])
+
+
+# Barabasi-Albert preferential attachment (3 edges per new node), i.e. a few very high-degree hubs
+def scale_free_graph(num_edges, rng):
+    attach = 3
+    graph = nx.barabasi_albert_graph(max(attach + 1, num_edges // attach), attach, seed=int(rng.integers(2**31)))
+    edges = np.array(graph.edges(), dtype=np.int64).reshape(-1, 2)
+    return _format_edges(edges[:, 0], edges[:, 1])
+
+
+# Random weighted graph, average degree ~4
+def sparse_weighted_graph(num_edges, rng):
+    src, dst = _random_pairs(rng, max(2, num_edges // 2), num_edges)
+    return _format_edges(src, dst, rng.integers(1, MAX_WEIGHT + 1, len(src)))
+
+
+# Random weighted graph, average degree ~64 (few nodes, many edges each)
+def dense_weighted_graph(num_edges, rng):
+    src, dst = _random_pairs(rng, max(8, num_edges // 32), num_edges)
+    return _format_edges(src, dst, rng.integers(1, MAX_WEIGHT + 1, len(src)))
+
+
+GENERATORS = {
+    "random": random_graph,
+    "grid": grid_graph,
+    "scale_free": scale_free_graph,
+    "sparse_weighted": sparse_weighted_graph,
+    "dense_weighted": dense_weighted_graph,
+}
+
+
+# --- Measurement --- #
+class StageTimer:
+    def __init__(self, trace_memory=True, repeat=1):
+        self.trace_memory = trace_memory
+        self.repeat = repeat
+
+    # Run fn() repeat times; returns (last result, best seconds, peak traced bytes or None)
+    def measure(self, fn):
+        best = math.inf
+        peak = None
+        result = None
+        for _ in range(self.repeat):
+            result = None # Drop the previous result so it does not count towards this run's peak
+            if self.trace_memory:
+                tracemalloc.reset_peak()
+                baseline = tracemalloc.get_traced_memory()[0]
+            start = time.perf_counter()
+            result = fn()
+            best = min(best, time.perf_counter() - start)
+            if self.trace_memory:
+                peak = max(peak or 0, tracemalloc.get_traced_memory()[1] - baseline)
+        return result, best, peak
+
+
+def _render(graph, pos, edge_labels, results, algorithm, source, target):
+    # Agg only: the benchmark must run without a display
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from renderer import GraphRenderer, result_highlight
+
+    fig = Figure(figsize=(7, 6), dpi=100)
+    canvas = FigureCanvasAgg(fig)
+    renderer = GraphRenderer(fig.add_subplot(111))
+    renderer.set_graph(graph, pos, edge_labels)
+    renderer.highlight(source=source, target=target, **result_highlight(algorithm, results))
+    canvas.draw()
+
+
+# Draw a tiny graph once so Matplotlib's imports and font setup are not charged to the first render stage
+def warm_up():
+    graph = nx.path_graph(["a", "b", "c"])
+    _render(graph, nx.circular_layout(graph), {("a", "b"): 1.0}, None, None, "a", None)
+
+
+# Time every stage for one generated graph; yields one result dict per stage
+def benchmark_graph(kind, size, seed, timer, algorithms=ALGORITHMS, layout_max_edges=LAYOUT_MAX_EDGES,
+                    render_max_edges=RENDER_MAX_EDGES):
+    text = GENERATORS[kind](size, np.random.default_rng(seed))
+    case = dict(graph=kind, size=size)
+
+    def stage(name, fn, **extra):
+        result, seconds, peak = timer.measure(fn)
+        record = dict(case, stage=name, seconds=round(seconds, 6), **extra)
+        if peak is not None:
+            record['peak_bytes'] = int(peak)
+        return result, record
+
+    edges, record = stage("parse", lambda: load_edge_text(text))
+    del text
+    yield record
+    graph, record = stage("build", lambda: edges.add_to_graph(nx.Graph()))
+    case.update(nodes=graph.number_of_nodes(), edges=graph.number_of_edges())
+    record.update(nodes=case['nodes'], edges=case['edges'])
+    yield record
+    csr = None
+    if use_csr(graph):
+        csr, record = stage("csr", lambda: CSRGraph.from_networkx(graph))
+        yield record
+    fingerprint, record = stage("fingerprint", lambda: graph_fingerprint(graph))
+    yield record
+
+    nodes = list(graph)
+    source, target = nodes[0], nodes[-1]
+    results = {}
+    for algorithm in algorithms:
+        try:
+            results[algorithm], record = stage(algorithm, lambda: run_graph_algorithm(
+                graph, algorithm, source, target, csr=csr), backend="csr" if csr is not None else "networkx")
+        except nx.NetworkXNoPath:
+            results[algorithm], record = None, dict(case, stage=algorithm, skipped="no path")
+        yield record
+
+    if case['edges'] > layout_max_edges:
+        yield dict(case, stage="layout", skipped=f"more than {layout_max_edges} edges")
+        return
+    # No disk cache, so every size pays for a full layout
+    pos, record = stage("layout", lambda: LayoutManager(cache_dir=None).layout(graph, fingerprint=fingerprint),
+                        method=LayoutManager.resolve_method(graph, "Auto"))
+    yield record
+
+    if case['edges'] > render_max_edges:
+        yield dict(case, stage="render", skipped=f"more than {render_max_edges} edges")
+        return
+    highlighted = next((name for name in ("Dijkstra", "BFS") if results.get(name)), None)
+    edge_labels = edges.edge_labels()
+    _, record = stage("render", lambda: _render(graph, pos, edge_labels, results.get(highlighted), highlighted,
+                                                source, target))
+    yield record
+
+
+def _versions():
+    import matplotlib
+    return dict(python=platform.python_version(), numpy=np.__version__, networkx=nx.__version__,
+                matplotlib=matplotlib.__version__, platform=platform.platform())
+
+
+# --- Baseline comparison --- #
+def _key(record):
+    return record['graph'], record['size'], record['stage']
+
+
+# Returns a list of human-readable regression descriptions
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE, min_seconds=MIN_REGRESSION_SECONDS):
+    previous = {_key(record): record for record in baseline['results'] if 'seconds' in record}
+    regressions = []
+    for record in results['results']:
+        old = previous.get(_key(record))
+        if old is None or 'seconds' not in record:
+            continue
+        slower = record['seconds'] - old['seconds']
+        if slower > min_seconds and record['seconds'] > old['seconds'] * (1 + tolerance):
+            regressions.append(f"{'/'.join(map(str, _key(record)))}: {old['seconds']:.4f}s -> {record['seconds']:.4f}s")
+        if 'peak_bytes' in record and 'peak_bytes' in old and old['peak_bytes'] > 0:
+            if record['peak_bytes'] > old['peak_bytes'] * (1 + tolerance) and record['peak_bytes'] - old['peak_bytes'] > 1 << 20:
+                regressions.append(f"{'/'.join(map(str, _key(record)))}: peak memory "
+                                   f"{old['peak_bytes'] / 2**20:.1f} MiB -> {record['peak_bytes'] / 2**20:.1f} MiB")
+    return regressions
+
+
+def _size(text):
+    return int(float(text)) # Accepts 1e5 as well as 100000
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark parsing, algorithms, layout and rendering "
+                                                 "on reproducible synthetic graphs.")
+    parser.add_argument("--graphs", default=",".join(GENERATORS),
+                        help=f"Comma-separated graph kinds from {', '.join(GENERATORS)} (default: all)")
+    parser.add_argument("--sizes", default=",".join(f"{size:.0e}" for size in DEFAULT_SIZES),
+                        help="Comma-separated target edge counts (default: 1e2 to 1e6)")
+    parser.add_argument("--algorithms", default=",".join(ALGORITHMS), help="Algorithms to time (default: all)")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Generator seed (default: 0)")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per stage; the fastest is kept (default: 1)")
+    parser.add_argument("--layout-max-edges", type=_size, default=LAYOUT_MAX_EDGES,
+                        help=f"Skip layout and rendering above this many edges (default: {LAYOUT_MAX_EDGES})")
+    parser.add_argument("--render-max-edges", type=_size, default=RENDER_MAX_EDGES,
+                        help=f"Skip rendering above this many edges (default: {RENDER_MAX_EDGES})")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="Do not trace memory (tracemalloc slows Python-heavy stages down)")
+    parser.add_argument("--output", "-o", help="Write the results JSON here (default: stdout)")
+    parser.add_argument("--baseline", help="Results JSON of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help=f"Allowed slowdown as a fraction (default: {DEFAULT_TOLERANCE})")
+    args = parser.parse_args(argv)
+    args.graphs = [kind.strip() for kind in args.graphs.split(",") if kind.strip()]
+    args.sizes = [_size(size) for size in args.sizes.split(",") if size.strip()]
+    args.algorithms = [name.strip() for name in args.algorithms.split(",") if name.strip()]
+    for kind in args.graphs:
+        if kind not in GENERATORS:
+            parser.error(f"unknown graph kind: {kind}")
+    for name in args.algorithms:
+        if name not in ALGORITHMS:
+            parser.error(f"unknown algorithm: {name}")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    trace_memory = not args.no_memory
+    timer = StageTimer(trace_memory, max(1, args.repeat))
+    if trace_memory:
+        tracemalloc.start()
+    warm_up()
+    records = []
+    for kind in args.graphs:
+        for size in args.sizes:
+            for record in benchmark_graph(kind, size, args.seed, timer, args.algorithms,
+                                          args.layout_max_edges, args.render_max_edges):
+                records.append(record)
+                # Progress on stderr so stdout can carry the JSON
+                detail = f"{record['seconds']:.4f}s" if 'seconds' in record else f"skipped ({record['skipped']})"
+                print(f"{kind:>16} {size:>8} {record['stage']:>12}  {detail}", file=sys.stderr)
+    if trace_memory:
+        tracemalloc.stop()
+
+    results = dict(meta=dict(_versions(), seed=args.seed, repeat=args.repeat, memory_traced=trace_memory,
+                             created=datetime.now(timezone.utc).isoformat(timespec='seconds')),
+                   results=records)
+    text = json.dumps(results, indent=1)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get('meta', {}).get('memory_traced') != trace_memory:
+            print("Warning: baseline was recorded with a different --no-memory setting; timings are not comparable.",
+                  file=sys.stderr)
+        regressions = compare(results, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            return 1
+        print(f"No regressions against {args.baseline}.", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
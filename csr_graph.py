@@ -0,0 +1,254 @@
+# Compressed sparse row (CSR) copy of an undirected graph and the visualizer's algorithms on it.
+# Node i's neighbours are indices[indptr[i]:indptr[i + 1]] with matching weights, in the same
+# order as networkx's adjacency, so traversal and tie-breaking give the same results as the
+# networkx functions in algorithms.py. Compared with nx.Graph's dict of dicts this is three flat
+# arrays, and the inner loops work on ints (BFS a whole frontier at a time in NumPy).
+import heapq
+import math
+
+import networkx as nx
+import numpy as np
+
+CANCEL_CHECK_INTERVAL = 65536 # Loop iterations between cancellation checks
+
+
+class CSRGraph:
+    def __init__(self, nodes, indptr, indices, weights):
+        self.nodes = nodes # Index -> node label
+        self.index = {node: i for i, node in enumerate(nodes)}
+        self.indptr = indptr # (n + 1,) int64
+        self.indices = indices # (2m,) int32, each undirected edge stored in both directions
+        self.weights = weights # (2m,) float64, missing weights are 1 like in networkx
+        self._lists = None
+
+    # Freeze an undirected nx.Graph (the graph itself is not modified or kept)
+    @classmethod
+    def from_networkx(cls, graph, weight='weight'):
+        nodes = list(graph)
+        index = {node: i for i, node in enumerate(nodes)}
+        lookup = index.__getitem__
+        degrees, indices, weights = [], [], []
+        # graph._adj is the plain dict of dicts behind graph.adj; the read-only views around it
+        # cost more than the copy itself on large graphs
+        for nbrs in graph._adj.values():
+            degrees.append(len(nbrs))
+            indices.extend(map(lookup, nbrs))
+            weights.extend([data.get(weight, 1) for data in nbrs.values()])
+        indptr = np.zeros(len(nodes) + 1, dtype=np.int64)
+        np.cumsum(degrees, out=indptr[1:])
+        return cls(nodes, indptr, np.array(indices, dtype=np.int32), np.array(weights, dtype=np.float64))
+
+    @property
+    def num_nodes(self):
+        return len(self.nodes)
+
+    @property
+    def num_edges(self):
+        # Self-loops are stored once, every other edge twice
+        rows = np.repeat(np.arange(self.num_nodes), np.diff(self.indptr))
+        loops = int(np.count_nonzero(self.indices == rows))
+        return (len(self.indices) - loops) // 2 + loops
+
+    def node_index(self, node):
+        try:
+            return self.index[node]
+        except KeyError:
+            raise nx.NodeNotFound(f"Node {node} is not in the graph.") from None
+
+    # Plain Python lists of the arrays: indexing a list in a loop is much cheaper than a NumPy scalar
+    def _as_lists(self):
+        if self._lists is None:
+            self._lists = (self.indptr.tolist(), self.indices.tolist(), self.weights.tolist())
+        return self._lists
+
+    def _labels(self, pairs):
+        nodes = self.nodes
+        return [(nodes[u], nodes[v]) for u, v in pairs]
+
+    # BFS tree edges from source, same order as nx.bfs_edges. Each level is expanded at once:
+    # a node's parent is the first frontier node (in queue order) that lists it, as in the queue version.
+    def bfs_edges(self, source, check_cancelled=None):
+        indptr, indices = self.indptr, self.indices
+        visited = np.zeros(self.num_nodes, dtype=bool)
+        start = self.node_index(source)
+        visited[start] = True
+        frontier = np.array([start], dtype=np.int64)
+        parents, children = [], []
+        while frontier.size:
+            if check_cancelled is not None:
+                check_cancelled()
+            starts = indptr[frontier]
+            counts = indptr[frontier + 1] - starts
+            total = int(counts.sum())
+            if total == 0:
+                break
+            # Positions of every frontier node's neighbour slots, in frontier order
+            slots = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(total)
+            nbrs = indices[slots]
+            fresh = ~visited[nbrs]
+            nbrs, owners = nbrs[fresh], np.repeat(frontier, counts)[fresh]
+            _, first = np.unique(nbrs, return_index=True)
+            first.sort()
+            frontier = nbrs[first].astype(np.int64)
+            visited[frontier] = True
+            parents.append(owners[first])
+            children.append(frontier)
+        if not parents:
+            return []
+        return self._labels(zip(np.concatenate(parents).tolist(), np.concatenate(children).tolist()))
+
+    # DFS tree edges from source, same order as nx.dfs_edges (iterative, no recursion limit)
+    def dfs_edges(self, source, check_cancelled=None):
+        indptr, indices, _ = self._as_lists()
+        start = self.node_index(source)
+        visited = bytearray(self.num_nodes)
+        visited[start] = 1
+        cursor = indptr[:-1] # Next neighbour slot to look at, per node
+        stack = [start]
+        edges = []
+        steps = 0
+        while stack:
+            u = stack[-1]
+            slot, end = cursor[u], indptr[u + 1]
+            while slot < end and visited[indices[slot]]:
+                slot += 1
+            if slot < end:
+                v = indices[slot]
+                cursor[u] = slot + 1
+                visited[v] = 1
+                edges.append((u, v))
+                stack.append(v)
+            else:
+                cursor[u] = slot
+                stack.pop()
+            steps += 1
+            if check_cancelled is not None and steps % CANCEL_CHECK_INTERVAL == 0:
+                check_cancelled()
+        return self._labels(edges)
+
+    # Binary-heap Dijkstra from source. Returns (dist, pred) arrays: dist is inf and pred -1 for
+    # unreached nodes. With a target, the search stops once the target is settled.
+    # Equal distances pop in push order (the counter), as in networkx, so tied paths agree.
+    # A shorter path to an already settled node (only possible with negative weights) raises the
+    # same ValueError as networkx instead of rewriting pred, which would leave a cycle for path_to.
+    def dijkstra(self, source, target=None, check_cancelled=None):
+        indptr, indices, weights = self._as_lists()
+        start = self.node_index(source)
+        goal = -1 if target is None else self.node_index(target)
+        n = self.num_nodes
+        dist = [math.inf] * n
+        pred = [-1] * n
+        settled = bytearray(n)
+        dist[start] = 0.0
+        heap = [(0.0, 0, start)]
+        pushes = 1
+        steps = 0
+        while heap:
+            d, _, u = heapq.heappop(heap)
+            if settled[u]:
+                continue
+            settled[u] = 1
+            if u == goal:
+                break
+            for slot in range(indptr[u], indptr[u + 1]):
+                v = indices[slot]
+                candidate = d + weights[slot]
+                if settled[v]:
+                    if candidate < dist[v]:
+                        raise ValueError("Contradictory paths found:", "negative weights?")
+                elif candidate < dist[v]:
+                    dist[v] = candidate
+                    pred[v] = u
+                    heapq.heappush(heap, (candidate, pushes, v))
+                    pushes += 1
+            steps += 1
+            if check_cancelled is not None and steps % CANCEL_CHECK_INTERVAL == 0:
+                check_cancelled()
+        return np.array(dist), np.array(pred, dtype=np.int64)
+
+    # Node labels along the pred tree from its root to target; raises NetworkXNoPath if unreached
+    def path_to(self, pred, source, target):
+        start, goal = self.node_index(source), self.node_index(target)
+        if goal != start and pred[goal] < 0:
+            raise nx.NetworkXNoPath(f"Node {target} not reachable from {source}")
+        path = [goal]
+        while path[-1] != start:
+            path.append(int(pred[path[-1]]))
+        return [self.nodes[i] for i in reversed(path)]
+
+    # Each undirected edge once, in graph.edges() order (u's row, v not earlier than u)
+    def undirected_edges(self):
+        rows = np.repeat(np.arange(self.num_nodes, dtype=np.int64), np.diff(self.indptr))
+        keep = self.indices >= rows
+        return rows[keep], self.indices[keep].astype(np.int64), self.weights[keep]
+
+    # Minimum spanning forest edges in Kruskal order; one stable argsort, then union-find on ints.
+    # NaN weights are skipped (like the step-by-step versions).
+    def kruskal_edges(self, check_cancelled=None):
+        u, v, w = self.undirected_edges()
+        order = np.argsort(w, kind='stable')
+        order = order[~np.isnan(w[order])]
+        us, vs = u[order].tolist(), v[order].tolist()
+        parent = list(range(self.num_nodes))
+        size = [1] * self.num_nodes
+        edges = []
+        wanted = self.num_nodes - 1 # A spanning tree is complete after n - 1 unions
+        for step, (a, b) in enumerate(zip(us, vs), 1):
+            ra = a
+            while parent[ra] != ra:
+                parent[ra] = parent[parent[ra]]
+                ra = parent[ra]
+            rb = b
+            while parent[rb] != rb:
+                parent[rb] = parent[parent[rb]]
+                rb = parent[rb]
+            if ra != rb:
+                if size[ra] < size[rb]:
+                    ra, rb = rb, ra
+                parent[rb] = ra
+                size[ra] += size[rb]
+                edges.append((a, b))
+                if len(edges) == wanted:
+                    break
+            if check_cancelled is not None and step % CANCEL_CHECK_INTERVAL == 0:
+                check_cancelled()
+        return self._labels(edges)
+
+    # Prim from source, continuing with the next unvisited node for other components (a spanning
+    # forest); same edges and order as algorithm_steps.prim_steps. NaN weights are skipped.
+    # An edge is only pushed if it beats the best one already queued for its endpoint: the others
+    # could only ever be popped as rejects, so the tree and its order are unchanged.
+    def prim_edges(self, source=None, check_cancelled=None):
+        indptr, indices, weights = self._as_lists()
+        n = self.num_nodes
+        visited = bytearray(n)
+        best = [math.inf] * n
+        first = [] if source is None else [self.node_index(source)]
+        edges = []
+        tie = 0
+        steps = 0
+        for start in first + list(range(n)):
+            if visited[start]:
+                continue
+            visited[start] = 1
+            heap = []
+            u = start
+            while True:
+                for slot in range(indptr[u], indptr[u + 1]):
+                    v = indices[slot]
+                    w = weights[slot]
+                    if w < best[v] and not visited[v]: # Also false for NaN
+                        best[v] = w
+                        heapq.heappush(heap, (w, tie, u, v))
+                        tie += 1
+                while heap and visited[heap[0][3]]:
+                    heapq.heappop(heap)
+                if not heap:
+                    break
+                _, _, parent, u = heapq.heappop(heap)
+                visited[u] = 1
+                edges.append((parent, u))
+                steps += 1
+                if check_cancelled is not None and steps % CANCEL_CHECK_INTERVAL == 0:
+                    check_cancelled()
+        return self._labels(edges)
@@ -0,0 +1,144 @@
+# Background execution engine for the visualizer.
+# Jobs (parsing, algorithms, layout) run on a worker pool; progress and results are
+# handed back to the Tk main loop through master.after polling, since Tk widgets may
+# only be touched from the main thread.
+import queue
+import threading
+from concurrent.futures import Future
+
+POLL_INTERVAL_MS = 50 # How often the main loop drains the worker message queue
+
+
+# Raised inside a job (via RunContext.check_cancelled) once its run was cancelled or superseded
+class RunCancelled(Exception):
+    pass
+
+
+# Handed to every job: lets it report progress and notice cancellation between steps
+class RunContext:
+    def __init__(self, run_id, messages):
+        self.run_id = run_id
+        self._messages = messages
+        self._cancel_event = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    def check_cancelled(self):
+        if self._cancel_event.is_set():
+            raise RunCancelled()
+
+    # fraction is 0..1, or None when the step has no measurable progress
+    def progress(self, message, fraction=None):
+        self.check_cancelled()
+        self._messages.put(('progress', self.run_id, (message, fraction)))
+
+
+class ExecutionEngine:
+    # Worker threads (not processes) so jobs can share the networkx graph without pickling it.
+    # networkx is pure Python and holds the GIL, but the interpreter switches threads every few
+    # milliseconds, which keeps the Tk loop responsive between its polls.
+    # The workers are daemon threads: a running job (a long layout may never check for
+    # cancellation) must not keep the process alive once the window is closed.
+    def __init__(self, master, max_workers=2, poll_interval_ms=POLL_INTERVAL_MS):
+        self.master = master
+        self.poll_interval_ms = poll_interval_ms
+        self._jobs = queue.Queue() # (future, job, ctx), or None to stop a worker
+        self._workers = [threading.Thread(target=self._work, name=f"graph-worker_{i}", daemon=True)
+                         for i in range(max_workers)]
+        for worker in self._workers:
+            worker.start()
+        self._messages = queue.Queue()
+        self._callbacks = {} # run_id -> (on_done, on_error, on_progress)
+        self._current = None # RunContext of the run whose results we still want
+        self._next_id = 0
+        self._polling = False
+
+    # Start job(ctx) on the pool. Any run still in flight is cancelled and its result dropped.
+    # Callbacks are invoked on the Tk main thread: on_done(result), on_error(exc), on_progress(message, fraction).
+    def submit(self, job, on_done, on_error=None, on_progress=None):
+        self.cancel()
+        self._next_id += 1
+        ctx = RunContext(self._next_id, self._messages)
+        self._current = ctx
+        self._callbacks[ctx.run_id] = (on_done, on_error, on_progress)
+        future = Future()
+        self._jobs.put((future, job, ctx))
+        future.add_done_callback(lambda f, run_id=ctx.run_id: self._messages.put(('done', run_id, f)))
+        self._schedule_poll()
+        return ctx.run_id
+
+    # Stop caring about the current run. The worker stops at its next check_cancelled();
+    # whatever it was doing in the meantime is discarded when it finishes.
+    def cancel(self):
+        if self._current is not None:
+            self._current.cancel()
+            self._callbacks.pop(self._current.run_id, None)
+            self._current = None
+
+    # Stop the workers without waiting for a running job (daemon threads end with the process)
+    def shutdown(self):
+        self.cancel()
+        while True: # Queued jobs never start
+            try:
+                future, _, _ = self._jobs.get_nowait()
+            except queue.Empty:
+                break
+            future.cancel()
+        for _ in self._workers:
+            self._jobs.put(None)
+
+    def _work(self):
+        while True:
+            item = self._jobs.get()
+            if item is None:
+                return
+            future, job, ctx = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = job(ctx)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+
+    def _schedule_poll(self):
+        if not self._polling:
+            self._polling = True
+            self.master.after(self.poll_interval_ms, self._poll)
+
+    def _poll(self):
+        self._polling = False
+        while True:
+            try:
+                kind, run_id, payload = self._messages.get_nowait()
+            except queue.Empty:
+                break
+            callbacks = self._callbacks.get(run_id)
+            if callbacks is None:
+                continue # Stale message from a cancelled or superseded run
+            on_done, on_error, on_progress = callbacks
+            if kind == 'progress':
+                if on_progress is not None:
+                    on_progress(*payload)
+                continue
+            # kind == 'done'
+            del self._callbacks[run_id]
+            if self._current is not None and self._current.run_id == run_id:
+                self._current = None
+            exc = payload.exception()
+            if exc is None:
+                on_done(payload.result())
+            elif isinstance(exc, RunCancelled):
+                pass
+            elif on_error is not None:
+                on_error(exc)
+            else:
+                raise exc
+        if self._callbacks:
+            self._schedule_poll()
@@ -0,0 +1,421 @@
+# Scalable force-directed layout for large graphs (NumPy only).
+#
+# Fruchterman-Reingold forces with two accelerations:
+#  * Barnes-Hut style repulsion on an adaptive quadtree of grid levels: a cell stops refining
+#    once it and its neighbours hold only a few nodes, and its nodes then repel the nodes of
+#    the adjacent cells exactly; every farther group is approximated by its cell's centroid and
+#    mass, using the coarsest level at which the two cells are still well separated.
+#    Each level costs O(nodes still refining), so one iteration is ~O(n log n) however unevenly
+#    the nodes are spread.
+#  * Multilevel coarsening: the graph is repeatedly shrunk by merging matched neighbours,
+#    the coarsest graph is laid out from scratch, and each finer level starts from the
+#    coarser positions, so only a handful of iterations are needed on the full graph.
+#    Every level is at most half the size of the one below it, so all levels together cost
+#    about as much as two passes over the full graph.
+# Connected components only repel each other apart, so after every level they are packed side
+# by side again (translated, not re-laid out): a stray edge cannot drift off, stretch the
+# quadtree or shrink the rest of the drawing to a dot.
+import numpy as np
+
+EXACT_REPULSION_NODES = 400 # Below this, all-pairs repulsion is cheaper than building the quadtree
+MAX_DEPTH = 30 # Only (nearly) coincident nodes get this deep
+MAX_NEAR_NODES = 24 # A cell stops refining once its 3x3 neighbourhood holds at most this many nodes
+DENSE_GRID_CELLS = 1 << 20 # Levels with at most this many cells use a direct lookup table instead of a search
+COARSEST_NODES = 60 # Stop coarsening once the graph is this small...
+MIN_COARSENING_RATIO = 0.85 # ...or when a round removes less than 15% of the nodes
+MATCHING_ROUNDS = 3
+COARSEST_ITERATIONS = 150
+LEVEL_ITERATIONS = 20 # Iterations on intermediate levels
+FINEST_ITERATIONS = 12 # Iterations on the full graph
+WARM_START_ITERATIONS = 10
+PACK_MARGIN = 2.0 # Gap between packed components, in edge lengths
+EPS = 1e-9
+
+# A cell's interaction list: children of its parent's neighbours that are not neighbours of the
+# cell itself. Which 27 offsets those are depends on the cell's position (bx, by) inside its parent.
+# The relation is symmetric, so only the "forward" half (dx > 0, or dx == 0 and dy > 0) is kept.
+_FAR_OFFSETS_BY_PARITY = {
+    (bx, by): tuple(np.array(axis) for axis in zip(*[(dx, dy) for dx in range(-2 - bx, 4 - bx)
+                                                     for dy in range(-2 - by, 4 - by)
+                                                     if (abs(dx) > 1 or abs(dy) > 1) and (dx, dy) > (0, 0)]))
+    for bx in (0, 1) for by in (0, 1)
+}
+# Own cell and its eight neighbours; those before (0, 0) are the mirrored "backward" half
+_NEAR_OFFSETS = [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1)]
+
+
+# Layout a networkx graph; returns {node: array([x, y])} scaled to [-1, 1] like nx.spring_layout.
+# pos (optional) gives starting positions for every node and switches to a short warm-start refinement.
+def barnes_hut_layout(graph, pos=None, seed=42, iterations=None):
+    nodes = list(graph)
+    n = len(nodes)
+    if n == 0:
+        return {}
+    index = {node: i for i, node in enumerate(nodes)}
+    m = graph.number_of_edges()
+    src = np.fromiter((index[u] for u, v in graph.edges()), dtype=np.int64, count=m)
+    dst = np.fromiter((index[v] for u, v in graph.edges()), dtype=np.int64, count=m)
+    init_xy = None
+    if pos is not None and all(node in pos for node in nodes):
+        init_xy = np.array([pos[node] for node in nodes], dtype=float)
+    xy = force_layout(n, src, dst, init_xy=init_xy, seed=seed, iterations=iterations)
+    return dict(zip(nodes, xy))
+
+
+# Array interface: n nodes, edges (src[i], dst[i]). Returns an (n, 2) float array in [-1, 1].
+def force_layout(n, src, dst, init_xy=None, seed=42, iterations=None):
+    rng = np.random.default_rng(seed)
+    src, dst = _undirected(np.asarray(src, dtype=np.int64), np.asarray(dst, dtype=np.int64))
+    if n == 1:
+        return np.zeros((1, 2))
+    components = _components(n, src, dst)
+
+    if init_xy is not None:
+        # Warm start: bring the given positions to the k = 1 scale and refine gently
+        xy = _to_unit_density(np.asarray(init_xy, dtype=float), n)
+        xy = _refine(xy, src, dst, np.ones(n), iterations or WARM_START_ITERATIONS, start_temp=0.5, rng=rng)
+        return _rescale(_pack_components(xy, *components))
+
+    # Build the coarsening hierarchy: levels[0] is the input graph
+    levels = [(n, src, dst, np.ones(n), None)]
+    while levels[-1][0] > COARSEST_NODES:
+        level_n, level_src, level_dst, mass, _ = levels[-1]
+        # Match repeatedly until the graph has at least halved, so there are only O(log n) levels to refine
+        groups = np.arange(level_n)
+        coarse_n, coarse_src, coarse_dst = level_n, level_src, level_dst
+        while coarse_n > level_n // 2 and coarse_n > COARSEST_NODES:
+            step_groups, step_n = _match(coarse_n, coarse_src, coarse_dst, rng)
+            if step_n > MIN_COARSENING_RATIO * coarse_n:
+                break
+            groups = step_groups[groups]
+            coarse_src, coarse_dst = _coarse_edges(step_groups, coarse_src, coarse_dst, step_n)
+            coarse_n = step_n
+        if coarse_n > MIN_COARSENING_RATIO * level_n:
+            break
+        coarse_mass = np.bincount(groups, weights=mass, minlength=coarse_n)
+        levels.append((coarse_n, coarse_src, coarse_dst, coarse_mass, groups))
+    # Groups never span two components, so each coarse node takes the label of its members
+    level_components = [components]
+    for level in levels[1:]:
+        labels = np.empty(level[0], dtype=np.int64)
+        labels[level[4]] = level_components[-1][0]
+        level_components.append((labels, components[1]))
+
+    # Lay out the coarsest level from scratch, then prolong level by level
+    coarse_n, coarse_src, coarse_dst, coarse_mass, _ = levels[-1]
+    side = np.sqrt(coarse_n)
+    xy = rng.uniform(-side / 2, side / 2, size=(coarse_n, 2))
+    xy = _refine(xy, coarse_src, coarse_dst, coarse_mass, COARSEST_ITERATIONS, start_temp=side / 4, rng=rng)
+    xy = _pack_components(xy, *level_components[-1])
+    for depth in range(len(levels) - 1, 0, -1):
+        groups = levels[depth][4]
+        fine_n, fine_src, fine_dst, fine_mass, _ = levels[depth - 1]
+        # Children start on their parent (spread out to the finer level's density) plus jitter
+        xy = xy[groups] * np.sqrt(fine_n / levels[depth][0]) + rng.normal(scale=0.1, size=(fine_n, 2))
+        level_iterations = (iterations or FINEST_ITERATIONS) if depth == 1 else LEVEL_ITERATIONS
+        xy = _refine(xy, fine_src, fine_dst, fine_mass, level_iterations, start_temp=1.0, rng=rng)
+        xy = _pack_components(xy, *level_components[depth - 1])
+    if len(levels) == 1 and iterations:
+        xy = _refine(xy, src, dst, np.ones(n), iterations, start_temp=1.0, rng=rng)
+        xy = _pack_components(xy, *components)
+    return _rescale(xy)
+
+
+# Fruchterman-Reingold iterations with k = 1 and linear cooling
+def _refine(xy, src, dst, mass, iterations, start_temp, rng):
+    n = len(xy)
+    for it in range(iterations):
+        temp = start_temp * (1.0 - it / iterations) + 0.01
+        force = _repulsion(xy, mass) + _attraction(xy, src, dst)
+        length = np.sqrt((force ** 2).sum(axis=1))
+        step = np.minimum(length, temp) / np.maximum(length, EPS)
+        xy = xy + force * step[:, None]
+        # Nodes on the exact same spot get no repulsion direction; nudge them apart
+        if it == 0 and n > 1:
+            xy += rng.normal(scale=1e-3, size=xy.shape)
+    return xy
+
+
+# Spring force d^2 / k along every edge, k = 1 (edge arrays hold both directions,
+# so each endpoint is pulled once as the source)
+def _attraction(xy, src, dst):
+    n = len(xy)
+    delta = xy[dst] - xy[src]
+    dist = np.sqrt((delta ** 2).sum(axis=1))
+    pull = delta * dist[:, None] # |delta| * delta = d^2 in the edge direction
+    return np.column_stack((np.bincount(src, weights=pull[:, 0], minlength=n),
+                            np.bincount(src, weights=pull[:, 1], minlength=n)))
+
+
+# Repulsion k^2 * m_j / d from every other node j, k = 1
+def _repulsion(xy, mass):
+    n = len(xy)
+    if n <= EXACT_REPULSION_NODES:
+        z = xy[:, 0] + 1j * xy[:, 1]
+        delta = z[:, None] - z[None, :]
+        delta[delta == 0] = np.inf # Self (and coincident nodes) contribute nothing
+        force = (mass[None, :] / np.conj(delta)).sum(axis=1)
+        return np.column_stack((force.real, force.imag))
+
+    lo = xy.min(axis=0)
+    size = (xy.max(axis=0) - lo).max() * (1 + 1e-6) + EPS
+    unit = (xy - lo) / size # All nodes inside [0, 1)^2
+    # Complex coordinates keep the inner loops short: m / conj(a - b) == m * (a - b) / |a - b|^2
+    z = xy[:, 0] + 1j * xy[:, 1]
+    force = np.empty(n, dtype=complex)
+
+    # Walk down the levels with the nodes whose cells are still crowded. Every pair of nodes is
+    # counted once: on the first level where their cells are not adjacent (far field), or on the
+    # level where the first of the two cells stops refining (near field).
+    # present: the nodes still in the tree, with their coordinates, masses and force so far
+    present, p_unit, p_xy, p_z, p_mass = np.arange(n), unit, xy, z, mass
+    p_force = np.zeros(n, dtype=complex)
+    level = 2
+    while len(present):
+        cells = _CellLevel(p_unit, level, p_mass, p_xy)
+        p_force += _far_field(cells)[cells.node_cell]
+        # Only cells that are not crowded on their own can have an uncrowded neighbourhood
+        if level < MAX_DEPTH and cells.node_count.min() > MAX_NEAR_NODES:
+            level += 1
+            continue
+        # Occupied neighbour (or -1) of every cell, per offset in _NEAR_OFFSETS
+        neighbours = np.array([cells.find(cells.cx + dx, cells.cy + dy) for dx, dy in _NEAR_OFFSETS])
+        crowd = np.where(neighbours >= 0, cells.node_count[neighbours], 0).sum(axis=0)
+        done = (crowd <= MAX_NEAR_NODES) | (level >= MAX_DEPTH)
+        if done.any():
+            p_force += _near_field(cells, neighbours, done, p_z, p_mass)
+            finished = done[cells.node_cell]
+            force[present[finished]] = p_force[finished]
+            keep = ~finished
+            present, p_unit, p_xy, p_z, p_mass, p_force = (
+                present[keep], p_unit[keep], p_xy[keep], p_z[keep], p_mass[keep], p_force[keep])
+        level += 1
+    return np.column_stack((force.real, force.imag))
+
+
+# Cell-to-cell repulsion between each cell and its interaction list, per cell
+def _far_field(cells):
+    centroid = cells.centroid[:, 0] + 1j * cells.centroid[:, 1]
+    cell_force = np.zeros(cells.count, dtype=complex)
+    for (bx, by), (dxs, dys) in _FAR_OFFSETS_BY_PARITY.items():
+        mine = np.nonzero((cells.cx & 1 == bx) & (cells.cy & 1 == by))[0]
+        if len(mine) == 0:
+            continue
+        # The forward half of the interaction list of every cell in this class at once:
+        # shape (offsets, len(mine)); each pair pushes both cells apart
+        other = cells.find(cells.cx[mine][None, :] + dxs[:, None], cells.cy[mine][None, :] + dys[:, None])
+        hit = other >= 0
+        a = np.broadcast_to(mine[None, :], other.shape)[hit]
+        b = other[hit]
+        push = 1.0 / np.conj(centroid[a] - centroid[b])
+        cell_force += _complex_bincount(a, push * cells.mass[b], cells.count)
+        cell_force -= _complex_bincount(b, push * cells.mass[a], cells.count)
+    return cell_force
+
+
+# Exact repulsion, per node of cells, between the nodes of the finished cells (done) and every node
+# in the same or an adjacent cell, each pair once: the forward half of the neighbours (a < b inside a
+# cell) covers pairs between finished cells, the backward half is only needed towards unfinished
+# cells, whose nodes do not look for pairs themselves. Both nodes of a pair are pushed apart.
+def _near_field(cells, neighbours, done, z, mass):
+    n = len(z)
+    order = np.argsort(cells.node_cell, kind='stable')
+    starts = np.concatenate(([0], np.cumsum(cells.node_count)[:-1]))
+    nodes = np.flatnonzero(done[cells.node_cell])
+    node_cells = cells.node_cell[nodes]
+    all_done = done.all()
+    pairs = []
+    for (dx, dy), cell_other in zip(_NEAR_OFFSETS, neighbours):
+        backward = (dx, dy) < (0, 0)
+        if backward and all_done:
+            continue
+        other = cell_other[node_cells]
+        hit = other >= 0
+        if backward:
+            hit &= ~done[np.maximum(other, 0)]
+        span = cells.node_count[other[hit]]
+        total = int(span.sum())
+        if total == 0:
+            continue
+        # Expand each node against every member of the neighbouring cell
+        a = np.repeat(nodes[hit], span)
+        offsets = np.arange(total) - np.repeat(np.cumsum(span) - span, span)
+        b = order[np.repeat(starts[other[hit]], span) + offsets]
+        if dx == 0 and dy == 0:
+            keep = a < b
+            a, b = a[keep], b[keep]
+        pairs.append((a, b))
+    if not pairs:
+        return np.zeros(n, dtype=complex)
+    # One pass over all pairs: bincount costs O(n) per call however few pairs there are
+    a, b = (np.concatenate(side) for side in zip(*pairs))
+    delta = z[a] - z[b]
+    delta[delta == 0] = EPS # Coincident nodes: any direction will do, the jitter separates them
+    push = 1.0 / np.conj(delta)
+    return _complex_bincount(a, push * mass[b], n) - _complex_bincount(b, push * mass[a], n)
+
+
+def _complex_bincount(index, values, n):
+    return np.bincount(index, weights=values.real, minlength=n) + 1j * np.bincount(index, weights=values.imag, minlength=n)
+
+
+# Occupied cells of one quadtree level, with mass, centroid and a neighbour lookup
+class _CellLevel:
+    def __init__(self, unit, level, mass, xy):
+        self.level = level
+        self.grid = grid = 1 << level
+        coords = np.minimum((unit * grid).astype(np.int64), grid - 1)
+        flat = coords[:, 0] * grid + coords[:, 1]
+        if grid * grid <= DENSE_GRID_CELLS:
+            # Direct-indexed slot table: no sorting needed
+            counts = np.bincount(flat, minlength=grid * grid)
+            self.ids = np.flatnonzero(counts)
+            self._slots = np.full(grid * grid, -1, dtype=np.int64)
+            self._slots[self.ids] = np.arange(len(self.ids))
+            self.node_cell = self._slots[flat]
+            self.node_count = counts[self.ids]
+        else:
+            self._slots = None
+            self.ids, self.node_cell, self.node_count = np.unique(flat, return_inverse=True, return_counts=True)
+            self.node_cell = self.node_cell.ravel()
+        self.count = len(self.ids)
+        self.cx, self.cy = self.ids // grid, self.ids % grid
+        self.mass = np.bincount(self.node_cell, weights=mass, minlength=self.count)
+        self.centroid = np.column_stack((np.bincount(self.node_cell, weights=xy[:, 0] * mass, minlength=self.count),
+                                         np.bincount(self.node_cell, weights=xy[:, 1] * mass, minlength=self.count)))
+        self.centroid /= self.mass[:, None]
+
+    # Index of the occupied cell at (cx, cy), or -1 if it is empty or off the grid
+    def find(self, cx, cy):
+        grid = self.grid
+        valid = (cx >= 0) & (cx < grid) & (cy >= 0) & (cy < grid)
+        wanted = np.where(valid, cx * grid + cy, 0)
+        if self._slots is not None:
+            return np.where(valid, self._slots[wanted], -1)
+        idx = np.minimum(np.searchsorted(self.ids, wanted), self.count - 1)
+        return np.where(valid & (self.ids[idx] == wanted), idx, -1)
+
+
+# Handshake matching: every node proposes to its neighbour with the smallest random key and
+# mutual proposals are merged. Leftover nodes that share a neighbour (e.g. the leaves of a star)
+# are then paired with each other, so hubs do not stop the coarsening. Groups never exceed two nodes.
+def _match(n, src, dst, rng):
+    groups = np.full(n, -1, dtype=np.int64)
+    next_group = 0
+    for _ in range(MATCHING_ROUNDS):
+        free = groups < 0
+        mask = free[src] & free[dst]
+        if not mask.any():
+            break
+        s, d = src[mask], dst[mask]
+        key = rng.random(n)
+        best = np.full(n, np.inf)
+        np.minimum.at(best, s, key[d])
+        choice = np.full(n, -1, dtype=np.int64)
+        pick = key[d] == best[s]
+        choice[s[pick]] = d[pick]
+        has = choice >= 0
+        mutual = np.zeros(n, dtype=bool)
+        mutual[has] = choice[choice[has]] == np.arange(n)[has]
+        leaders = np.nonzero(mutual & (np.arange(n) < choice))[0]
+        groups[leaders] = np.arange(next_group, next_group + len(leaders))
+        groups[choice[leaders]] = groups[leaders]
+        next_group += len(leaders)
+    # Two-hop pairing: sort the leftovers by one of their neighbours and pair consecutive siblings
+    free = groups < 0
+    anchor = np.full(n, -1, dtype=np.int64)
+    edge_from_free = free[src]
+    anchor[src[edge_from_free]] = dst[edge_from_free]
+    left = np.nonzero(free & (anchor >= 0))[0]
+    left = left[np.argsort(anchor[left], kind='stable')]
+    if len(left) > 1:
+        same = anchor[left[:-1]] == anchor[left[1:]]
+        # Rank within each run of equal anchors; pair ranks (0, 1), (2, 3), ...
+        run_start = np.concatenate(([True], ~same))
+        rank = np.arange(len(left)) - np.maximum.accumulate(np.where(run_start, np.arange(len(left)), 0))
+        firsts = np.nonzero(np.concatenate((same, [False])) & (rank % 2 == 0))[0]
+        groups[left[firsts]] = np.arange(next_group, next_group + len(firsts))
+        groups[left[firsts + 1]] = groups[left[firsts]]
+        next_group += len(firsts)
+    free = groups < 0
+    groups[free] = np.arange(next_group, next_group + int(free.sum()))
+    next_group += int(free.sum())
+    return groups, next_group
+
+
+def _coarse_edges(groups, src, dst, coarse_n):
+    a, b = groups[src], groups[dst]
+    keep = a != b
+    a, b = np.minimum(a[keep], b[keep]), np.maximum(a[keep], b[keep])
+    keys = np.unique(a * coarse_n + b)
+    return _undirected(keys // coarse_n, keys % coarse_n)
+
+
+# Both directions of every edge, without self-loops, as used by the matching and the spring force
+def _undirected(src, dst):
+    keep = src != dst
+    src, dst = src[keep], dst[keep]
+    return np.concatenate((src, dst)), np.concatenate((dst, src))
+
+
+# Component label (0..count-1) of every node, and the count: roots are hooked onto the smallest
+# neighbouring root and pointers jumped until no edge joins two trees (O(log n) rounds in practice)
+def _components(n, src, dst):
+    labels = np.arange(n)
+    while True:
+        hooked = labels.copy()
+        np.minimum.at(hooked, labels[src], labels[dst])
+        while True:
+            jumped = hooked[hooked]
+            if np.array_equal(jumped, hooked):
+                break
+            hooked = jumped
+        if np.array_equal(hooked, labels):
+            break
+        labels = hooked
+    roots, labels = np.unique(labels, return_inverse=True)
+    return labels.ravel(), len(roots)
+
+
+# Move each connected component (labels from _components; translated, not re-laid out) into
+# shelf-packed rows, tallest first, in a block about as wide as it is high
+def _pack_components(xy, labels, count):
+    if count == 1:
+        return xy
+    lo = np.full((count, 2), np.inf)
+    hi = np.full((count, 2), -np.inf)
+    np.minimum.at(lo, labels, xy)
+    np.maximum.at(hi, labels, xy)
+    size = hi - lo + PACK_MARGIN
+    order = np.argsort(-size[:, 1], kind='stable')
+    width = max(size[:, 0].max(), np.sqrt((size[:, 0] * size[:, 1]).sum()))
+    start = np.cumsum(size[order, 0]) - size[order, 0]
+    _, row = np.unique(np.floor(start / width), return_inverse=True)
+    row = row.ravel()
+    rows = row[-1] + 1
+    row_start = np.full(rows, np.inf)
+    np.minimum.at(row_start, row, start)
+    row_height = np.zeros(rows)
+    np.maximum.at(row_height, row, size[order, 1])
+    row_top = np.cumsum(row_height) - row_height
+    shift = np.empty((count, 2))
+    shift[order, 0] = start - row_start[row] - lo[order, 0]
+    shift[order, 1] = -row_top[row] - hi[order, 1]
+    return xy + shift[labels]
+
+
+def _to_unit_density(xy, n):
+    xy = xy - xy.mean(axis=0)
+    extent = np.abs(xy).max()
+    if extent < EPS:
+        return xy
+    return xy * (np.sqrt(n) / 2 / extent)
+
+
+# Center and scale into [-1, 1], matching networkx's rescale_layout
+def _rescale(xy):
+    xy = xy - xy.mean(axis=0)
+    extent = np.abs(xy).max()
+    if extent > 0:
+        xy = xy / extent
+    return xy
@@ -0,0 +1,178 @@
+# Streaming edge-list loader for the visualizer.
+# Reads "u v [weight]" lines in chunks into compact columns instead of one Python
+# tuple/dict per edge: node names are interned to int32 IDs, weights go into a float64 array.
+from array import array
+
+import numpy as np
+
+DEFAULT_CHUNK_SIZE = 1 << 20 # Characters read per chunk from a file
+MAX_REPORTED_LINES = 10 # How many bad lines are quoted verbatim in the summary
+CANCEL_CHECK_LINES = 65536 # Lines parsed between cancellation checks
+
+
+# Collects malformed lines so the caller can show ONE summary instead of a dialog per line
+class ParseReport:
+    def __init__(self):
+        self.malformed_count = 0 # Lines with the wrong number of fields
+        self.bad_weight_count = 0 # Lines whose weight is not numeric
+        self.samples = [] # (line_num, line, reason) for the first few problems
+
+    def add(self, line_num, line, reason):
+        if reason == "non-numeric weight":
+            self.bad_weight_count += 1
+        else:
+            self.malformed_count += 1
+        if len(self.samples) < MAX_REPORTED_LINES:
+            self.samples.append((line_num, line.strip(), reason))
+
+    @property
+    def error_count(self):
+        return self.malformed_count + self.bad_weight_count
+
+    def __bool__(self):
+        return self.error_count > 0
+
+    def summary(self):
+        if not self:
+            return "No problems found."
+        lines = [f"Skipped {self.error_count} line(s): {self.malformed_count} malformed, "
+                 f"{self.bad_weight_count} with a non-numeric weight.",
+                 "Expected format: u v [weight]", ""]
+        for line_num, line, reason in self.samples:
+            lines.append(f"Line {line_num} ({reason}): '{line}'")
+        if self.error_count > len(self.samples):
+            lines.append(f"... and {self.error_count - len(self.samples)} more.")
+        return "\n".join(lines)
+
+
+# Column-oriented edge list: edge i goes from node_names[src[i]] to node_names[dst[i]]
+class EdgeList:
+    def __init__(self, node_names, src, dst, weight, weighted, report):
+        self.node_names = node_names # list of str, index == node ID (order of first appearance)
+        self.src = src # int32 array of source node IDs
+        self.dst = dst # int32 array of target node IDs
+        self.weight = weight # float64 array (1.0 where no weight was given)
+        self.weighted = weighted # bool array, True where the line had a weight
+        self.report = report
+
+    @property
+    def num_nodes(self):
+        return len(self.node_names)
+
+    @property
+    def num_edges(self):
+        return len(self.src)
+
+    @property
+    def has_weights(self):
+        return bool(self.weighted.any())
+
+    # Bulk-load nodes and edges into a networkx graph, preserving input order
+    def add_to_graph(self, graph):
+        names = self.node_names
+        graph.add_nodes_from(names)
+        us = map(names.__getitem__, self.src.tolist())
+        vs = map(names.__getitem__, self.dst.tolist())
+        if not self.has_weights:
+            graph.add_edges_from(zip(us, vs))
+        elif self.weighted.all():
+            graph.add_weighted_edges_from(zip(us, vs, self.weight.tolist()))
+        else:
+            # Mixed input: only weighted lines get a 'weight' attribute, like the line-by-line parser did
+            graph.add_edges_from((u, v, {'weight': w}) if flag else (u, v)
+                                 for u, v, w, flag in zip(us, vs, self.weight.tolist(), self.weighted.tolist()))
+        return graph
+
+    # {(u, v): weight} for the weighted edges, as used for drawing weight labels
+    def edge_labels(self):
+        if not self.has_weights:
+            return {}
+        names = self.node_names
+        mask = self.weighted
+        return {(names[u], names[v]): w for u, v, w in zip(self.src[mask].tolist(),
+                                                           self.dst[mask].tolist(),
+                                                           self.weight[mask].tolist())}
+
+
+# Parse an iterable of text chunks (chunk boundaries may fall anywhere, even mid-line).
+# check_cancelled(), if given, is called regularly and may raise to abort the parse.
+def load_edge_chunks(chunks, check_cancelled=None):
+    node_index = {}
+    node_names = []
+    src = array('i')
+    dst = array('i')
+    weight = array('d')
+    weighted = array('b')
+    report = ParseReport()
+    line_num = 0
+    pending = ""
+
+    def parse_lines(lines):
+        nonlocal line_num
+        for line in lines:
+            line_num += 1
+            if check_cancelled is not None and line_num % CANCEL_CHECK_LINES == 0:
+                check_cancelled()
+            parts = line.split()
+            count = len(parts)
+            if count == 0:
+                continue # Skip empty lines
+            if count == 3:
+                try:
+                    w = float(parts[2])
+                except ValueError:
+                    report.add(line_num, line, "non-numeric weight")
+                    continue
+                flag = 1
+            elif count == 2:
+                w = 1.0
+                flag = 0
+            else:
+                report.add(line_num, line, "expected 2 or 3 fields")
+                continue
+            u, v = parts[0], parts[1]
+            ui = node_index.get(u)
+            if ui is None:
+                ui = node_index[u] = len(node_names)
+                node_names.append(u)
+            vi = node_index.get(v)
+            if vi is None:
+                vi = node_index[v] = len(node_names)
+                node_names.append(v)
+            src.append(ui)
+            dst.append(vi)
+            weight.append(w)
+            weighted.append(flag)
+
+    for chunk in chunks:
+        if not chunk:
+            continue
+        lines = (pending + chunk).split('\n')
+        pending = lines.pop() # Last piece may be an incomplete line, keep it for the next chunk
+        parse_lines(lines)
+    if pending:
+        parse_lines([pending])
+
+    return EdgeList(node_names,
+                    np.frombuffer(src, dtype=np.int32).copy(),
+                    np.frombuffer(dst, dtype=np.int32).copy(),
+                    np.frombuffer(weight, dtype=np.float64).copy(),
+                    np.frombuffer(weighted, dtype=np.int8).astype(bool),
+                    report)
+
+
+def iter_file_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+
+def load_edge_file(path, chunk_size=DEFAULT_CHUNK_SIZE, check_cancelled=None):
+    return load_edge_chunks(iter_file_chunks(path, chunk_size), check_cancelled)
+
+
+def load_edge_text(text):
+    return load_edge_chunks([text])
@@ -0,0 +1,148 @@
+# Lightweight per-stage instrumentation for the visualizer.
+# Each stage (parsing, algorithm, layout, drawing, ...) is wrapped in Instrumentation.stage(),
+# which records its wall time, optionally the memory it allocated (tracemalloc, off by default
+# because it slows Python code down), and any details the caller adds (e.g. artist counts).
+# Records are grouped per run for the GUI's stats panel and can also be appended to a JSONL
+# trace file. Stages may run on worker threads; everything here is thread-safe and Tk-free.
+import json
+import threading
+import time
+import tracemalloc
+from collections import OrderedDict
+from contextlib import contextmanager
+
+MAX_RUNS_KEPT = 20 # Runs whose records stay in memory
+
+
+class Instrumentation:
+    def __init__(self, trace_path=None, trace_memory=False):
+        self._lock = threading.Lock()
+        self._runs = OrderedDict() # run id -> {'info': {...}, 'records': [...]}
+        self._run_id = 0
+        self._trace_file = None
+        self._trace_memory = False
+        self.set_trace_file(trace_path)
+        self.trace_memory = trace_memory
+
+    @property
+    def run_id(self):
+        return self._run_id
+
+    @property
+    def trace_path(self):
+        return None if self._trace_file is None else self._trace_file.name
+
+    # Append every record to path as JSON lines (None stops tracing)
+    def set_trace_file(self, path):
+        with self._lock:
+            if self._trace_file is not None:
+                self._trace_file.close()
+            self._trace_file = open(path, 'a', encoding='utf-8') if path else None
+
+    @property
+    def trace_memory(self):
+        return self._trace_memory
+
+    @trace_memory.setter
+    def trace_memory(self, enabled):
+        if enabled and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        elif not enabled and self._trace_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._trace_memory = bool(enabled)
+
+    # Start a new group of records (one per "Run Algorithm" click); info describes the run
+    def begin_run(self, **info):
+        with self._lock:
+            self._run_id += 1
+            self._runs[self._run_id] = dict(info=dict(info, started=time.time()), records=[])
+            while len(self._runs) > MAX_RUNS_KEPT:
+                self._runs.popitem(last=False)
+            return self._run_id
+
+    # Add details to the current run (e.g. graph size once it is known)
+    def annotate(self, **info):
+        with self._lock:
+            if self._run_id in self._runs:
+                self._runs[self._run_id]['info'].update(info)
+
+    # with instrumentation.stage("layout", nodes=n) as details: ...; details may be updated inside
+    @contextmanager
+    def stage(self, name, **info):
+        details = dict(info)
+        run_id = self._run_id
+        memory = self._trace_memory and tracemalloc.is_tracing()
+        if memory:
+            tracemalloc.reset_peak() # Process-wide, so concurrent stages see each other's allocations
+            start_bytes = tracemalloc.get_traced_memory()[0]
+        start_wall = time.time()
+        start = time.perf_counter()
+        failed = None
+        try:
+            yield details
+        except BaseException as e:
+            failed = type(e).__name__
+            raise
+        finally:
+            record = dict(run=run_id, stage=name, start=round(start_wall, 6),
+                          seconds=round(time.perf_counter() - start, 6), thread=threading.current_thread().name)
+            if memory and tracemalloc.is_tracing():
+                current, peak = tracemalloc.get_traced_memory()
+                record['alloc_peak'] = max(0, peak - start_bytes)
+                record['alloc_net'] = current - start_bytes
+            if failed is not None:
+                record['error'] = failed
+            record.update(details)
+            self._add(record)
+
+    # Time every call of obj.method_name as a stage (replaces the bound method on that instance).
+    # details_fn(), if given, supplies extra fields after each call.
+    def wrap(self, obj, method_name, stage_name, details_fn=None):
+        original = getattr(obj, method_name)
+
+        def timed(*args, **kwargs):
+            with self.stage(stage_name) as details:
+                result = original(*args, **kwargs)
+                if details_fn is not None:
+                    details.update(details_fn())
+            return result
+        setattr(obj, method_name, timed)
+
+    def _add(self, record):
+        with self._lock:
+            run = self._runs.get(record['run'])
+            if run is not None:
+                run['records'].append(record)
+            if self._trace_file is not None:
+                self._trace_file.write(json.dumps(record, default=str) + "\n")
+                self._trace_file.flush()
+
+    def run_info(self, run_id=None):
+        with self._lock:
+            run = self._runs.get(self._run_id if run_id is None else run_id)
+            return {} if run is None else dict(run['info'])
+
+    # One row per stage name of a run, in first-seen order: calls, total/max seconds, largest
+    # allocation peak and the details of the last call (repeated stages such as redraws fold together)
+    def summary(self, run_id=None):
+        with self._lock:
+            run = self._runs.get(self._run_id if run_id is None else run_id)
+            records = [] if run is None else list(run['records'])
+        rows = OrderedDict()
+        for record in records:
+            row = rows.get(record['stage'])
+            if row is None:
+                row = rows[record['stage']] = dict(stage=record['stage'], calls=0, seconds=0.0, max_seconds=0.0,
+                                                   alloc_peak=None, details={})
+            row['calls'] += 1
+            row['seconds'] += record['seconds']
+            row['max_seconds'] = max(row['max_seconds'], record['seconds'])
+            if 'alloc_peak' in record:
+                row['alloc_peak'] = max(row['alloc_peak'] or 0, record['alloc_peak'])
+            row['details'] = {key: value for key, value in record.items()
+                              if key not in ('run', 'stage', 'start', 'seconds', 'alloc_peak', 'alloc_net')}
+        return list(rows.values())
+
+    def close(self):
+        self.set_trace_file(None)
+        self.trace_memory = False
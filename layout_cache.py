@@ -0,0 +1,237 @@
+# Incremental layout management for the visualizer.
+# Positions are cached per graph fingerprint and layout method (in memory and on disk).
+# When the graph changes, the previous positions are kept as the starting point, new nodes
+# are placed next to their already-placed neighbours, and the layout only runs a few
+# warm-start iterations.
+import hashlib
+import os
+import tempfile
+import threading
+import zipfile
+from collections import OrderedDict, deque
+
+import networkx as nx
+import numpy as np
+
+from fast_layout import barnes_hut_layout
+
+LAYOUT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "daa-graph-visualizer", "layouts")
+FULL_ITERATIONS = 50 # spring_layout's default, used when there is nothing to start from
+WARM_START_ITERATIONS = 10 # Iterations after seeding from previous positions (either method)
+NEW_NODE_JITTER = 0.05 # Spread of freshly placed nodes around their neighbours' centroid
+MEMORY_CACHE_SIZE = 8 # Layouts kept in memory (most recently used)
+HASH_BATCH = 65536 # Nodes/edges fed to the hash per update
+DISK_CACHE_MAX_BYTES = 256 * 2**20 # Least recently used layouts are deleted beyond this total size
+
+# Layout options offered in the GUI
+LAYOUT_AUTO = "Auto"
+LAYOUT_SPRING = "Spring"
+LAYOUT_BARNES_HUT = "Barnes-Hut (large graphs)"
+LAYOUT_METHODS = [LAYOUT_AUTO, LAYOUT_SPRING, LAYOUT_BARNES_HUT]
+LARGE_GRAPH_NODES = 2000 # "Auto" switches from spring_layout to Barnes-Hut above this many nodes
+
+
+# Stable hash of the node list, edge list and weights. Order-dependent on purpose: hashing in
+# insertion order is O(n + m), and the same input file always builds the graph in the same order.
+def graph_fingerprint(graph):
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{graph.number_of_nodes()}:{graph.number_of_edges()}|".encode())
+    nodes = list(graph)
+    for start in range(0, len(nodes), HASH_BATCH):
+        digest.update("\0".join(map(str, nodes[start:start + HASH_BATCH])).encode())
+    digest.update(b"|")
+    batch = []
+    for u, v, w in graph.edges(data='weight'):
+        batch.append(f"{u}\0{v}\0{w}")
+        if len(batch) >= HASH_BATCH:
+            digest.update("\1".join(batch).encode())
+            batch = []
+    if batch:
+        digest.update("\1".join(batch).encode())
+    return digest.hexdigest()
+
+
+class LayoutManager:
+    def __init__(self, cache_dir=LAYOUT_CACHE_DIR, seed=42):
+        self.cache_dir = cache_dir # None disables the on-disk cache
+        self.seed = seed
+        self._memory = OrderedDict() # "<fingerprint>-<method>" -> pos dict
+        self._lock = threading.Lock() # layout() is called from worker threads
+
+    # Return {node: array([x, y])} for graph, reusing cached or previous positions where possible.
+    # Pass fingerprint if the caller already hashed the graph.
+    def layout(self, graph, prev_pos=None, method=LAYOUT_AUTO, fingerprint=None):
+        if graph.number_of_nodes() == 0:
+            return {}
+        key = self._key(graph, method, fingerprint)
+        method = self.resolve_method(graph, method)
+        pos = self._lookup(key, graph)
+        if pos is not None:
+            return pos
+
+        if prev_pos and any(node in prev_pos for node in graph):
+            pos = self._warm_start_layout(graph, prev_pos, method)
+        else:
+            pos = self._full_layout(graph, method=method)
+        self._store(key, pos)
+        return pos
+
+    # Take positions computed elsewhere (e.g. restored from a snapshot) as graph's layout for method,
+    # so the next layout() call returns them as-is. Kept in memory only.
+    def adopt(self, graph, pos, method=LAYOUT_AUTO, fingerprint=None):
+        key = self._key(graph, method, fingerprint)
+        with self._lock:
+            self._remember(key, pos)
+
+    def _key(self, graph, method, fingerprint=None):
+        method = self.resolve_method(graph, method)
+        return f"{fingerprint or graph_fingerprint(graph)}-{'bh' if method == LAYOUT_BARNES_HUT else 'spring'}"
+
+    @staticmethod
+    def resolve_method(graph, method):
+        if method == LAYOUT_AUTO:
+            return LAYOUT_BARNES_HUT if graph.number_of_nodes() > LARGE_GRAPH_NODES else LAYOUT_SPRING
+        return method
+
+    def _lookup(self, key, graph):
+        with self._lock:
+            pos = self._memory.get(key)
+            if pos is not None:
+                self._memory.move_to_end(key)
+                return pos
+        pos = self._load(key)
+        if pos is None or len(pos) != graph.number_of_nodes() or not all(node in pos for node in graph):
+            return None
+        with self._lock:
+            self._remember(key, pos)
+        return pos
+
+    def _store(self, key, pos):
+        with self._lock:
+            self._remember(key, pos)
+        self._save(key, pos)
+
+    def _remember(self, key, pos):
+        self._memory[key] = pos
+        self._memory.move_to_end(key)
+        while len(self._memory) > MEMORY_CACHE_SIZE:
+            self._memory.popitem(last=False)
+
+    # Layout fallback chain for a graph with no usable previous positions
+    def _full_layout(self, graph, init_pos=None, iterations=None, method=LAYOUT_SPRING):
+        if method == LAYOUT_BARNES_HUT:
+            try:
+                return barnes_hut_layout(graph, pos=init_pos, seed=self.seed, iterations=iterations)
+            except Exception as e:
+                print(f"Layout Error (Barnes-Hut): {e}. Using random layout.")
+                return nx.random_layout(graph, seed=self.seed)
+        iterations = iterations or FULL_ITERATIONS
+        try:
+            # Use a seed for reproducibility
+            return nx.spring_layout(graph, pos=init_pos, iterations=iterations, seed=self.seed)
+        except Exception as e: # Handle layout errors
+            print(f"Layout Error (Spring): {e}. Trying Kamada-Kawai.")
+            try: # Fallback layout
+                return nx.kamada_kawai_layout(graph, pos=init_pos)
+            except Exception as e2: # Final fallback
+                print(f"Fallback Layout Error (Kamada-Kawai): {e2}. Using random layout.")
+                return nx.random_layout(graph, seed=self.seed)
+
+    def _warm_start_layout(self, graph, prev_pos, method):
+        init_pos = self.place_new_nodes(graph, prev_pos)
+        return self._full_layout(graph, init_pos=init_pos, iterations=WARM_START_ITERATIONS, method=method)
+
+    # Keep known positions and put every new node near the centroid of its placed neighbours.
+    # New nodes are visited breadth-first outwards from the placed ones, so chains of new nodes
+    # grow out of the existing layout; components with no placed node are scattered over its extent.
+    def place_new_nodes(self, graph, prev_pos):
+        rng = np.random.default_rng(self.seed)
+        pos = {node: np.asarray(prev_pos[node], dtype=float) for node in graph if node in prev_pos}
+        points = np.array(list(pos.values()))
+        lo, hi = points.min(axis=0), points.max(axis=0)
+        frontier = deque(pos)
+        remaining = (node for node in graph if node not in prev_pos)
+        while True:
+            while frontier:
+                node = frontier.popleft()
+                for nbr in graph[node]:
+                    if nbr in pos:
+                        continue
+                    placed = [pos[n] for n in graph[nbr] if n in pos]
+                    pos[nbr] = np.mean(placed, axis=0) + rng.normal(scale=NEW_NODE_JITTER, size=2)
+                    frontier.append(nbr)
+            # Anything left is in a component without a placed node: seed one node and grow from it
+            seed_node = next((node for node in remaining if node not in pos), None)
+            if seed_node is None:
+                return pos
+            pos[seed_node] = rng.uniform(lo, hi)
+            frontier.append(seed_node)
+
+    # --- On-disk cache --- # One .npz per fingerprint and method: node names plus an (n, 2) position array
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.npz")
+
+    def _load(self, key):
+        if self.cache_dir is None:
+            return None
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                names, xy = data['nodes'].tolist(), data['xy']
+            os.utime(path) # Mark as recently used for _prune()
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile) as e:
+            # Damaged (e.g. truncated) file: drop it so the layout is recomputed and saved again
+            print(f"Warning: removing unreadable layout cache {path}: {e}")
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        return dict(zip(names, xy))
+
+    def _save(self, key, pos):
+        if self.cache_dir is None:
+            return
+        names = list(pos)
+        if not all(isinstance(node, str) for node in names):
+            return # Only string node IDs (what the parser produces) round-trip through the cache
+        tmp_path = None
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # A private temporary file per writer: other threads/processes may be saving the same key
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, nodes=np.array(names, dtype=str), xy=np.array([pos[n] for n in names], dtype=float))
+            os.replace(tmp_path, self._path(key)) # Atomic, so a crash never leaves half a file
+            tmp_path = None
+            self._prune()
+        except OSError as e:
+            print(f"Warning: could not save layout cache: {e}")
+        finally:
+            if tmp_path is not None:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+
+    # Delete the least recently used layouts until the cache fits in DISK_CACHE_MAX_BYTES
+    def _prune(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".npz"):
+                try:
+                    stat = os.stat(os.path.join(self.cache_dir, name))
+                except OSError:
+                    continue # Removed by another process meanwhile
+                entries.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries)[:-1]: # Never the newest, i.e. the layout just saved
+            if total <= DISK_CACHE_MAX_BYTES:
+                break
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except OSError:
+                pass
+            total -= size
@@ -0,0 +1,151 @@
+# Parse -> algorithm steps without any GUI dependency. The Tk app runs them on its worker
+# threads; batch.py runs them in worker processes.
+from contextlib import nullcontext
+
+import networkx as nx
+import numpy as np
+
+from graph_loader import load_edge_chunks, load_edge_file
+from algorithms import run_graph_algorithm, use_csr
+from csr_graph import CSRGraph
+from layout_cache import graph_fingerprint
+
+
+# Everything parsing one input produces
+class ParsedGraph:
+    def __init__(self, graph, edge_labels, report, version, csr=None, draw_arrays=None):
+        self.graph = graph
+        self.edge_labels = edge_labels # (u, v) -> weight, for drawing
+        self.report = report # graph_loader.ParseReport of skipped lines
+        self.version = version # Fingerprint; keys the layout and shortest-path caches
+        self.csr = csr # CSRGraph copy for large graphs, else None
+        self._draw_arrays = draw_arrays
+
+    # Built on first use; the GUI touches it on a worker thread so drawing never loops over the edges
+    @property
+    def draw_arrays(self):
+        if self._draw_arrays is None:
+            self._draw_arrays = build_draw_arrays(self.graph, self.edge_labels, self.csr)
+        return self._draw_arrays
+
+
+# What GraphRenderer draws, as arrays: node order, (m, 2) edge endpoints in graph.edges() order and
+# the edges carrying weight labels. Edges are looked up through a sorted array of u * n + v keys
+# (u < v) instead of a dict of node-pair tuples, which would cost seconds to build on large graphs.
+class DrawArrays:
+    def __init__(self, nodes, edge_endpoints, node_index=None):
+        self.nodes = nodes
+        self.node_index = node_index if node_index is not None else {node: i for i, node in enumerate(nodes)}
+        self.edge_endpoints = np.asarray(edge_endpoints, dtype=np.int64).reshape(-1, 2)
+        keys = self._keys(self.edge_endpoints)
+        self._edge_order = np.argsort(keys)
+        self._edge_keys = keys[self._edge_order]
+        self.label_edges = np.empty(0, dtype=np.int64) # Edge numbers with a weight label
+        self.label_weights = np.empty(0)
+        self._positions = (None, None) # (pos dict, (n, 2) array) of the last positions() call
+
+    def _keys(self, ends):
+        a, b = ends[:, 0], ends[:, 1]
+        return np.minimum(a, b) * len(self.nodes) + np.maximum(a, b)
+
+    # Edge numbers of the (u, v) pairs (either direction), plus a mask of which pairs are edges
+    def find_edges(self, pairs):
+        get = self.node_index.get
+        ends = np.fromiter((i for u, v in pairs for i in (get(u, -1), get(v, -1))), dtype=np.int64).reshape(-1, 2)
+        if len(self._edge_keys) == 0:
+            return np.empty(0, dtype=np.int64), np.zeros(len(ends), dtype=bool)
+        keys = self._keys(ends)
+        slots = np.minimum(np.searchsorted(self._edge_keys, keys), len(self._edge_keys) - 1)
+        found = (ends >= 0).all(axis=1) & (self._edge_keys[slots] == keys)
+        return self._edge_order[slots[found]], found
+
+    # Label the edges of edge_labels ((u, v) -> weight); pairs that are not edges are ignored
+    def set_labels(self, edge_labels):
+        numbers, found = self.find_edges(edge_labels.keys())
+        weights = np.fromiter(edge_labels.values(), dtype=float, count=len(edge_labels))[found]
+        # An edge given as both (u, v) and (v, u) keeps the later weight, like the graph itself
+        last = len(numbers) - 1 - np.unique(numbers[::-1], return_index=True)[1]
+        self.label_edges = numbers[last]
+        self.label_weights = weights[last]
+
+    # (n, 2) positions in node order; the array for the last pos passed is kept, so computing it on
+    # a worker right after the layout saves the Tk thread the work
+    def positions(self, pos):
+        if self._positions[0] is not pos:
+            n = len(self.nodes)
+            self._positions = (pos, np.array([pos[node] for node in self.nodes], dtype=float).reshape(n, 2))
+        return self._positions[1]
+
+
+def build_draw_arrays(graph, edge_labels=None, csr=None):
+    if csr is not None:
+        rows, cols, _ = csr.undirected_edges() # Same order as graph.edges(), without touching the graph
+        arrays = DrawArrays(csr.nodes, np.column_stack((rows, cols)), csr.index)
+    else:
+        nodes = list(graph)
+        index = {node: i for i, node in enumerate(nodes)}
+        m = graph.number_of_edges()
+        endpoints = np.fromiter((i for u, v in graph.edges() for i in (index[u], index[v])),
+                                dtype=np.int64, count=2 * m)
+        arrays = DrawArrays(nodes, endpoints, index)
+    if edge_labels:
+        arrays.set_labels(edge_labels)
+    return arrays
+
+
+def _no_stage(name, **info):
+    return nullcontext({})
+
+
+# Parse an edge file, or else an iterable of text chunks. progress(message) is called between stages;
+# stage(name, **info) is a context manager wrapping each one (e.g. Instrumentation.stage).
+# check_cancelled() is called regularly while parsing and may raise to abort.
+def parse_graph(edge_file_path=None, chunks=(), progress=None, stage=None, check_cancelled=None):
+    stage = stage or _no_stage
+    if progress is not None:
+        progress("Parsing graph...")
+    with stage("parse", source="file" if edge_file_path is not None else "text") as details:
+        if edge_file_path is not None:
+            edges = load_edge_file(edge_file_path, check_cancelled=check_cancelled)
+        else:
+            edges = load_edge_chunks(chunks, check_cancelled)
+        details.update(edges=edges.num_edges, skipped_lines=edges.report.error_count)
+
+    if progress is not None:
+        progress("Building graph...")
+    with stage("build graph") as details:
+        # Bulk insert from the parsed columns; nodes come along with their edges
+        graph = edges.add_to_graph(nx.Graph())
+        details.update(nodes=graph.number_of_nodes(), edges=graph.number_of_edges())
+    # Large graphs are also frozen into CSR arrays, which the algorithms run on much faster
+    csr = None
+    if use_csr(graph):
+        if progress is not None:
+            progress("Building array graph...")
+        with stage("csr arrays"):
+            csr = CSRGraph.from_networkx(graph)
+    # Hashed once here; the same input parsed again gets the same version and hits the caches
+    with stage("fingerprint"):
+        version = graph_fingerprint(graph)
+    return ParsedGraph(graph, edges.edge_labels(), edges.report, version, csr)
+
+
+# Run algorithm on a parsed graph; same results as run_graph_algorithm. With a ShortestPathService,
+# Dijkstra is answered from / stored in its cache.
+def run_on_graph(parsed, algorithm, source_node=None, target_node=None, check_cancelled=None,
+                 shortest_paths=None):
+    if algorithm == "Dijkstra" and shortest_paths is not None:
+        path, _ = shortest_paths.shortest_path(parsed.graph, parsed.version, source_node, target_node,
+                                               parsed.csr, check_cancelled)
+        return path
+    return run_graph_algorithm(parsed.graph, algorithm, source_node, target_node, check_cancelled,
+                               csr=parsed.csr)
+
+
+# Path length (Dijkstra) or total tree weight (Kruskal/Prim); None for traversals
+def result_weight(graph, algorithm, results):
+    if algorithm == "Dijkstra":
+        return sum(graph[u][v].get('weight', 1) for u, v in zip(results, results[1:]))
+    if algorithm in ("Kruskal", "Prim"):
+        return sum(graph[u][v].get('weight', 1) for u, v in results)
+    return None
@@ -0,0 +1,445 @@
+# Persistent matplotlib artists for the visualizer.
+# The nodes become one PathCollection and the edges one LineCollection, built once per graph.
+# Highlighting a result only rewrites their color/width/size arrays in place, so re-highlighting
+# never rebuilds artists; the caller follows up with canvas.draw_idle().
+#
+# Level of detail: labels are not created per node/edge. Whenever the axis limits change
+# (zoom/pan with the toolbar), the elements inside the viewport are counted and labels are
+# drawn from a small reusable pool only once few enough are visible. When very many edges
+# are visible, the LineCollection is swapped for a rasterized edge-density image plus an
+# overlay holding just the highlighted edges. On graphs too big to ever show every edge as a
+# line, the LineCollection only holds the edges overlapping the viewport. Nodes get the same
+# treatment: on big graphs the PathCollection only holds the nodes in view, and while too many
+# are visible a node-density image stands in for them, with markers left only on restyled nodes.
+import numpy as np
+from matplotlib.collections import LineCollection
+from matplotlib.colors import to_rgba
+
+from pipeline import DrawArrays, build_draw_arrays
+
+# Base style (matches the old nx.draw_networkx_* calls)
+NODE_COLOR = 'lightblue'
+NODE_SIZE = 500
+NODE_ALPHA = 0.9
+SOURCE_COLOR = 'lightgreen'
+TARGET_COLOR = 'salmon'
+EDGE_COLOR = 'gray'
+EDGE_ALPHA = 0.6
+EDGE_WIDTH = 1.0
+HIGHLIGHT_ALPHA = 0.8
+HIGHLIGHT_WIDTH = 2.5
+HIGHLIGHT_NODE_SIZE = 600
+NODE_FONT_SIZE = 10
+EDGE_FONT_SIZE = 8
+MARGIN = 0.1 # Fraction of the layout extent added around it
+
+# Level-of-detail thresholds (counts of elements inside the current viewport)
+NODE_LABEL_LIMIT = 300 # Node labels are drawn only when at most this many nodes are visible
+EDGE_LABEL_LIMIT = 200 # Same for edge weights
+FULL_SIZE_NODE_LIMIT = 100 # Above this many visible nodes, markers shrink so the plot is not one blob
+MIN_NODE_SIZE = 2.0
+EDGE_AGGREGATE_LIMIT = 30000 # Above this many visible edges, draw a density image instead of lines
+NODE_AGGREGATE_LIMIT = 10000 # Same for nodes and their markers
+DENSITY_BINS = 400 # Resolution of the density images
+DENSITY_SAMPLES = 8 # Points sampled along each edge for the density image
+RASTERIZE_EDGES = 5000 # Edge collections this large are rasterized in vector output (PDF/SVG)
+LOD_DELAY_MS = 80 # Limit changes arrive in bursts while panning; recompute once they settle
+
+
+# Keyword arguments for GraphRenderer.highlight() showing an algorithm's results
+def result_highlight(algorithm_name, algorithm_results):
+    if algorithm_results is None:
+        return {}
+    if algorithm_name in ["BFS", "DFS"]: # Traversed edges
+        return dict(edges=algorithm_results, edge_color='blue')
+    if algorithm_name == "Dijkstra": # Path nodes and the edges between them
+        path_nodes = algorithm_results
+        path_edges = list(zip(path_nodes, path_nodes[1:]))
+        return dict(edges=path_edges, edge_color='red', nodes=path_nodes, node_color='orange')
+    if algorithm_name in ["Kruskal", "Prim"]: # MST edges
+        return dict(edges=algorithm_results, edge_color='green')
+    return {}
+
+
+class GraphRenderer:
+    def __init__(self, ax):
+        self.ax = ax
+        self.graph = None
+        self.pos = None
+        self.nodes = [] # Node order used by every per-node array
+        self.node_index = {}
+        self.xy = np.empty((0, 2)) # (n, 2) node positions
+        self.edge_endpoints = np.empty((0, 2), dtype=np.int64) # (m, 2) node indices per edge
+        self.arrays = DrawArrays([], self.edge_endpoints) # pipeline.DrawArrays being drawn (edge lookup)
+        self.node_artist = None # PathCollection
+        self.edge_artist = None # LineCollection
+        self.highlight_artist = None # LineCollection with only the highlighted edges (shown when aggregated)
+        self.density_artist = None # AxesImage used instead of edge_artist when zoomed out on a big graph
+        self.node_density_artist = None # Same for node_artist
+        self._node_base = None # (n, 4) RGBA of the un-highlighted nodes
+        self._edge_base = None # (m, 4) RGBA of the un-highlighted edges
+        self._node_colors = None # Current styles, edited by style_* and pushed by flush_style()
+        self._node_sizes = None # Sizes before level-of-detail scaling
+        self._edge_colors = None
+        self._edge_widths = None
+        self._midpoints = np.empty((0, 2))
+        self._edge_label_idx = np.empty(0, dtype=np.int64) # Edge numbers that carry a weight label
+        self._edge_label_weight = np.empty(0) # Their weights
+        self._node_label_pool = [] # Reused Text artists
+        self._edge_label_pool = []
+        self._aggregated = False
+        self._nodes_aggregated = False
+        self._edge_shown = None # Edge numbers in edge_artist when it is culled to the view, None = all
+        self._node_shown = None # Same for node_artist
+        self._lod_timer = None
+        self._suspend_lod = False
+
+    # Build the artists for graph/pos; a no-op when they are already showing that graph.
+    # arrays (pipeline.DrawArrays of graph, e.g. ParsedGraph.draw_arrays) skips building them here;
+    # the GUI passes them prepared on a worker so the Tk thread never loops over the edges.
+    def set_graph(self, graph, pos, edge_labels=None, arrays=None):
+        if graph is self.graph and pos is self.pos:
+            return False
+        if arrays is None:
+            arrays = build_draw_arrays(graph, edge_labels)
+        self.set_arrays(arrays, arrays.positions(pos))
+        self.graph = graph
+        self.pos = pos
+        return True
+
+    # Build the artists straight from a DrawArrays, without a networkx graph (e.g. from a memory-mapped
+    # snapshot): arrays.nodes[i] is at xy[i]
+    def set_arrays(self, arrays, xy):
+        self.clear()
+        self.arrays = arrays
+        self.nodes = arrays.nodes
+        self.node_index = arrays.node_index
+        self.xy = np.asarray(xy, dtype=float).reshape(len(self.nodes), 2)
+        self.edge_endpoints = arrays.edge_endpoints
+        n, m = len(self.nodes), len(self.edge_endpoints)
+        self._midpoints = (self.xy[self.edge_endpoints[:, 0]] + self.xy[self.edge_endpoints[:, 1]]) * 0.5
+        self._edge_label_idx = arrays.label_edges
+        self._edge_label_weight = arrays.label_weights
+
+        self._node_base = np.tile(to_rgba(NODE_COLOR, NODE_ALPHA), (n, 1))
+        self._edge_base = np.tile(to_rgba(EDGE_COLOR, EDGE_ALPHA), (m, 1))
+        self.reset_style()
+
+        # Edges first (zorder 1) so nodes (zorder 2) and labels (zorder 3) sit on top, like networkx draws them.
+        # Millions of segments take long to even build, so large graphs start empty; update_level_of_detail()
+        # fills in the edges in view once few enough are visible to be drawn as lines.
+        self._edge_shown = np.empty(0, dtype=np.int64) if m > EDGE_AGGREGATE_LIMIT else None
+        shown = self._shown_edges()
+        self.edge_artist = LineCollection(self.xy[self.edge_endpoints[shown]], colors=self._edge_base[shown].copy(),
+                                          linewidths=self._edge_widths[shown].copy(), zorder=1)
+        self.edge_artist.set_rasterized(m > RASTERIZE_EDGES)
+        self.ax.add_collection(self.edge_artist)
+        self.highlight_artist = LineCollection([], zorder=1.5, visible=False)
+        self.ax.add_collection(self.highlight_artist)
+        # Likewise hundreds of thousands of markers take seconds to draw: nodes are filled in the same way
+        self._node_shown = np.empty(0, dtype=np.int64) if n > NODE_AGGREGATE_LIMIT else None
+        shown = self._shown_nodes()
+        self.node_artist = self.ax.scatter(self.xy[shown, 0], self.xy[shown, 1], s=self._node_sizes[shown].copy(),
+                                           c=self._node_base[shown].copy(), zorder=2)
+
+        self._suspend_lod = True
+        self._fit_view()
+        self._suspend_lod = False
+        self.ax.callbacks.connect('xlim_changed', self._on_limits_changed)
+        self.ax.callbacks.connect('ylim_changed', self._on_limits_changed)
+        self.update_level_of_detail()
+
+    # The networkx graph behind the arrays passed to set_arrays() became available; set_graph()
+    # with the same graph and pos is then a no-op instead of a rebuild
+    def attach_graph(self, graph, pos):
+        if self.node_artist is not None and graph.number_of_nodes() == len(self.nodes):
+            self.graph = graph
+            self.pos = pos
+
+    def _fit_view(self):
+        if len(self.xy) == 0:
+            return
+        lo, hi = self.xy.min(axis=0), self.xy.max(axis=0)
+        pad = np.maximum((hi - lo) * MARGIN, 0.1)
+        self.ax.set_xlim(lo[0] - pad[0], hi[0] + pad[0])
+        self.ax.set_ylim(lo[1] - pad[1], hi[1] + pad[1])
+
+    # Remove every artist (e.g. when the graph was replaced or is empty)
+    def clear(self):
+        self._cancel_lod_timer()
+        self.ax.cla() # Also drops the limit callbacks registered in set_graph
+        self.ax.axis('off')
+        self.graph = None
+        self.pos = None
+        self.node_artist = None
+        self.edge_artist = None
+        self.highlight_artist = None
+        self.density_artist = None
+        self.node_density_artist = None
+        self._node_label_pool = []
+        self._edge_label_pool = []
+        self._aggregated = False
+        self._nodes_aggregated = False
+
+    # What is currently on the axes, for the stats panel
+    def artist_counts(self):
+        labels = sum(artist.get_visible() for artist in self._node_label_pool + self._edge_label_pool)
+        return dict(artists=len(self.ax.get_children()), nodes=len(self.nodes), edges=len(self.edge_endpoints),
+                    labels=labels, edge_mode='density' if self._aggregated else 'lines',
+                    node_mode='density' if self._nodes_aggregated else 'markers')
+
+    # Indices of the given edges/nodes; anything not in the graph is skipped
+    def edge_indices(self, edges):
+        return self.arrays.find_edges(edges)[0]
+
+    def node_indices(self, nodes):
+        get = self.node_index.get
+        indices = np.fromiter((get(node, -1) for node in nodes), dtype=np.int64)
+        return indices[indices >= 0]
+
+    # Restyle in place: everything goes back to the base style, then the given edges/nodes are emphasised.
+    # source/target are single nodes drawn in their own colors.
+    def highlight(self, edges=(), edge_color=None, nodes=(), node_color=None, source=None, target=None):
+        if self.node_artist is None:
+            return
+        self.reset_style(source, target)
+        if node_color is not None:
+            self.style_nodes(nodes, node_color, HIGHLIGHT_NODE_SIZE, alpha=None)
+        if edge_color is not None:
+            self.style_edges(edges, edge_color)
+        self.flush_style()
+
+    # --- Incremental styling --- # style_* only edit the per-element arrays; flush_style() hands
+    # them to the artists once, so an animation frame costs one update however many steps it covers.
+    def reset_style(self, source=None, target=None):
+        self._node_colors = self._node_base.copy()
+        self._node_sizes = np.full(len(self.nodes), float(NODE_SIZE))
+        self._edge_colors = self._edge_base.copy()
+        self._edge_widths = np.full(len(self.edge_endpoints), EDGE_WIDTH)
+        for node, color in ((source, SOURCE_COLOR), (target, TARGET_COLOR)):
+            if node in self.node_index:
+                self._node_colors[self.node_index[node]] = to_rgba(color, NODE_ALPHA)
+
+    # color=None puts the nodes back to the base style
+    def style_nodes(self, nodes, color=None, size=NODE_SIZE, alpha=NODE_ALPHA):
+        idx = self.node_indices(nodes)
+        if color is None:
+            self._node_colors[idx] = self._node_base[idx]
+            self._node_sizes[idx] = NODE_SIZE
+        else:
+            self._node_colors[idx] = to_rgba(color, alpha)
+            self._node_sizes[idx] = size
+
+    # color=None puts the edges back to the base style
+    def style_edges(self, edges, color=None, width=HIGHLIGHT_WIDTH):
+        idx = self.edge_indices(edges)
+        if color is None:
+            self._edge_colors[idx] = self._edge_base[idx]
+            self._edge_widths[idx] = EDGE_WIDTH
+        else:
+            self._edge_colors[idx] = to_rgba(color, HIGHLIGHT_ALPHA)
+            self._edge_widths[idx] = width
+
+    def flush_style(self):
+        if self.node_artist is None:
+            return
+        if self._nodes_aggregated: # The markers left over the density image follow the restyled nodes
+            self._show_nodes(self._restyled_nodes())
+        self.node_artist.set_facecolors(self._node_colors[self._shown_nodes()])
+        shown = self._shown_edges()
+        self.edge_artist.set_colors(self._edge_colors[shown])
+        self.edge_artist.set_linewidths(self._edge_widths[shown])
+        # Restyled edges again for the overlay that stays visible when the base edges are aggregated
+        idx = np.flatnonzero(np.any(self._edge_colors != self._edge_base, axis=1))
+        self.highlight_artist.set_segments(self.xy[self.edge_endpoints[idx]])
+        self.highlight_artist.set_colors(self._edge_colors[idx])
+        self.highlight_artist.set_linewidths(self._edge_widths[idx])
+        self._apply_node_sizes(self._visible_nodes())
+
+    # --- Level of detail --- #
+    def _on_limits_changed(self, ax):
+        if self._suspend_lod or self.node_artist is None:
+            return
+        canvas = self.ax.figure.canvas
+        # Debounce: x and y limits change separately and continuously while panning
+        self._cancel_lod_timer()
+        timer = canvas.new_timer(interval=LOD_DELAY_MS)
+        timer.single_shot = True
+        timer.add_callback(self._on_lod_timer)
+        self._lod_timer = timer
+        timer.start()
+
+    def _on_lod_timer(self):
+        self._lod_timer = None
+        self.update_level_of_detail()
+        self.ax.figure.canvas.draw_idle()
+
+    def _cancel_lod_timer(self):
+        if self._lod_timer is not None:
+            self._lod_timer.stop()
+            self._lod_timer = None
+
+    def _view_mask(self, points):
+        (x0, x1), (y0, y1) = sorted(self.ax.get_xlim()), sorted(self.ax.get_ylim())
+        return (points[:, 0] >= x0) & (points[:, 0] <= x1) & (points[:, 1] >= y0) & (points[:, 1] <= y1)
+
+    def _visible_nodes(self):
+        return np.flatnonzero(self._view_mask(self.xy))
+
+    # Show only what the current viewport can usefully display; call after changing the limits directly
+    def update_level_of_detail(self):
+        if self.node_artist is None:
+            return
+        visible_nodes = self._visible_nodes()
+        if self._node_shown is not None:
+            self._set_nodes_aggregated(len(visible_nodes) > NODE_AGGREGATE_LIMIT, visible_nodes)
+        self._apply_node_sizes(visible_nodes)
+        labelled_nodes = visible_nodes if len(visible_nodes) <= NODE_LABEL_LIMIT else ()
+        self._fill_pool(self._node_label_pool, labelled_nodes, self.xy, lambda i: str(self.nodes[i]),
+                        self._new_node_label)
+
+        labelled_visible = np.empty(0, dtype=np.int64)
+        if len(self._edge_label_idx):
+            in_view = self._view_mask(self._midpoints[self._edge_label_idx])
+            if in_view.sum() <= EDGE_LABEL_LIMIT:
+                labelled_visible = np.flatnonzero(in_view)
+        self._fill_pool(self._edge_label_pool, labelled_visible, self._midpoints[self._edge_label_idx],
+                        lambda k: f"{self._edge_label_weight[k]:g}", self._new_edge_label)
+
+        visible_edges = self._visible_edges()
+        aggregated = len(visible_edges) > EDGE_AGGREGATE_LIMIT
+        if self._edge_shown is not None and not aggregated:
+            # Long edges crossing the view count too: they can far outnumber the ones with an end in it
+            overlapping = self._edges_overlapping_view()
+            aggregated = len(overlapping) > EDGE_AGGREGATE_LIMIT
+            if not aggregated:
+                self._show_edges(overlapping)
+        self._set_aggregated(aggregated, visible_edges)
+
+    # Edges with at least one endpoint or their midpoint in view (cheap, close enough for counting)
+    def _visible_edges(self):
+        if len(self.edge_endpoints) == 0:
+            return np.empty(0, dtype=np.int64)
+        node_in_view = self._view_mask(self.xy)
+        mask = node_in_view[self.edge_endpoints[:, 0]] | node_in_view[self.edge_endpoints[:, 1]]
+        mask |= self._view_mask(self._midpoints)
+        return np.flatnonzero(mask)
+
+    # Edges whose bounding box overlaps the view: every edge that can cross it, for the culled line collection
+    def _edges_overlapping_view(self):
+        (x0, x1), (y0, y1) = sorted(self.ax.get_xlim()), sorted(self.ax.get_ylim())
+        ends = self.xy[self.edge_endpoints] # (m, 2, 2)
+        lo, hi = ends.min(axis=1), ends.max(axis=1)
+        return np.flatnonzero((lo[:, 0] <= x1) & (hi[:, 0] >= x0) & (lo[:, 1] <= y1) & (hi[:, 1] >= y0))
+
+    def _shown_edges(self):
+        return slice(None) if self._edge_shown is None else self._edge_shown
+
+    def _show_edges(self, edges):
+        self._edge_shown = edges
+        self.edge_artist.set_segments(self.xy[self.edge_endpoints[edges]])
+        self.edge_artist.set_colors(self._edge_colors[edges])
+        self.edge_artist.set_linewidths(self._edge_widths[edges])
+
+    def _shown_nodes(self):
+        return slice(None) if self._node_shown is None else self._node_shown
+
+    def _show_nodes(self, nodes):
+        self._node_shown = nodes
+        self.node_artist.set_offsets(self.xy[nodes])
+        self.node_artist.set_facecolors(self._node_colors[nodes])
+
+    # Nodes whose style differs from the base one (highlighted, source, target)
+    def _restyled_nodes(self):
+        changed = np.any(self._node_colors != self._node_base, axis=1) | (self._node_sizes != NODE_SIZE)
+        return np.flatnonzero(changed)
+
+    def _apply_node_sizes(self, visible_nodes):
+        scale = min(1.0, FULL_SIZE_NODE_LIMIT / max(len(visible_nodes), 1))
+        self.node_artist.set_sizes(np.maximum(self._node_sizes[self._shown_nodes()] * scale, MIN_NODE_SIZE))
+
+    # Point the first len(indices) pooled Text artists at the given items and hide the rest
+    def _fill_pool(self, pool, indices, positions, text_of, make_artist):
+        for k, i in enumerate(indices):
+            if k == len(pool):
+                pool.append(make_artist())
+            artist = pool[k]
+            artist.set_position(positions[i])
+            artist.set_text(text_of(i))
+            artist.set_visible(True)
+        for artist in pool[len(indices):]:
+            if artist.get_visible():
+                artist.set_visible(False)
+
+    def _new_node_label(self):
+        return self.ax.text(0, 0, "", fontsize=NODE_FONT_SIZE, ha='center', va='center', zorder=3, clip_on=True)
+
+    def _new_edge_label(self):
+        return self.ax.text(0, 0, "", fontsize=EDGE_FONT_SIZE, ha='center', va='center', zorder=3, clip_on=True,
+                            bbox=dict(boxstyle='round', ec=(1.0, 1.0, 1.0), fc=(1.0, 1.0, 1.0)))
+
+    # Swap the full LineCollection for an edge-density image (and back)
+    def _set_aggregated(self, aggregated, visible_edges):
+        if aggregated:
+            self._update_density(visible_edges)
+        elif self.density_artist is not None:
+            self.density_artist.set_visible(False)
+        self.edge_artist.set_visible(not aggregated)
+        self.highlight_artist.set_visible(aggregated)
+        self._aggregated = aggregated
+
+    # Swap the culled markers for a node-density image (and back); only used while node_artist is culled
+    def _set_nodes_aggregated(self, aggregated, visible_nodes):
+        if aggregated:
+            counts = self._bin_counts(*self._bin_coordinates(self.xy[visible_nodes]))
+            self.node_density_artist = self._draw_density(self.node_density_artist, counts, NODE_COLOR, NODE_ALPHA,
+                                                          zorder=2)
+        elif self.node_density_artist is not None:
+            self.node_density_artist.set_visible(False)
+        self._nodes_aggregated = aggregated
+        self._show_nodes(self._restyled_nodes() if aggregated else visible_nodes)
+
+    # DENSITY_SAMPLES points along each visible edge, binned one sample position at a time (a single
+    # (k, samples, 2) array of them is several times slower to build)
+    def _update_density(self, visible_edges):
+        col, row = self._bin_coordinates(self.xy)
+        ends = self.edge_endpoints[visible_edges]
+        col0, row0 = col[ends[:, 0]], row[ends[:, 0]]
+        col_step, row_step = col[ends[:, 1]] - col0, row[ends[:, 1]] - row0
+        counts = np.zeros(DENSITY_BINS * DENSITY_BINS, dtype=np.int64)
+        for t in np.linspace(0.0, 1.0, DENSITY_SAMPLES):
+            counts += self._bin_counts(col0 + col_step * t, row0 + row_step * t)
+        self.density_artist = self._draw_density(self.density_artist, counts, EDGE_COLOR, EDGE_ALPHA, zorder=1)
+
+    # Positions in units of density bins over the current view (uniform bins, so each point's bin is
+    # direct arithmetic; np.histogram2d binary-searches every one)
+    def _bin_coordinates(self, points):
+        (x0, x1), (y0, y1) = sorted(self.ax.get_xlim()), sorted(self.ax.get_ylim())
+        col = (points[:, 0] - x0) * (DENSITY_BINS / max(x1 - x0, 1e-12))
+        row = (points[:, 1] - y0) * (DENSITY_BINS / max(y1 - y0, 1e-12))
+        return col, row
+
+    # Points per bin (flat, row-major); points outside the view are dropped
+    def _bin_counts(self, col, row):
+        inside = (col >= 0) & (col < DENSITY_BINS) & (row >= 0) & (row < DENSITY_BINS)
+        cells = row[inside].astype(np.int64) * DENSITY_BINS + col[inside].astype(np.int64)
+        return np.bincount(cells, minlength=DENSITY_BINS * DENSITY_BINS)
+
+    # Show counts as an image over the current view in color, its opacity growing with the log of the
+    # count; artist is the AxesImage to reuse (None creates it)
+    def _draw_density(self, artist, counts, color, alpha, zorder):
+        (x0, x1), (y0, y1) = sorted(self.ax.get_xlim()), sorted(self.ax.get_ylim())
+        image = np.log1p(counts.reshape(DENSITY_BINS, DENSITY_BINS).astype(float))
+        if image.max() > 0:
+            image /= image.max()
+        rgba = np.zeros(image.shape + (4,))
+        rgba[..., :3] = to_rgba(color)[:3]
+        rgba[..., 3] = image * alpha
+        if artist is None:
+            artist = self.ax.imshow(rgba, extent=(x0, x1, y0, y1), origin='lower', aspect='auto',
+                                    interpolation='nearest', zorder=zorder)
+        else:
+            artist.set_data(rgba)
+            artist.set_extent((x0, x1, y0, y1))
+        artist.set_visible(True)
+        return artist
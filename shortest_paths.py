@@ -0,0 +1,122 @@
+# Shortest-path queries for the visualizer.
+# A single-source Dijkstra run leaves distances and predecessors for every reachable node;
+# those are kept (LRU, keyed by graph version and source) so the path, its length and any
+# later target from the same source are answered without searching again.
+# On large graphs a one-off query uses a point-to-point search instead (Dijkstra on the CSR
+# arrays stopping at the target, otherwise bidirectional Dijkstra); a source asked about a
+# second time gets the full single-source run, since it is likely to be asked again.
+import threading
+from collections import OrderedDict
+
+import networkx as nx
+
+SINGLE_SOURCE_CACHE_SIZE = 4 # Single-source results kept (each holds O(n) dicts)
+PATH_CACHE_SIZE = 64 # Point-to-point results kept
+POINT_TO_POINT_NODES = 50000 # Above this many nodes, a source's first query avoids the full single-source run
+
+
+# Single-source result from networkx: pred/dist dicts keyed by node
+class _DictTree:
+    def __init__(self, pred, dist):
+        self.pred = pred
+        self.dist = dist
+
+    def path(self, source, target):
+        if target not in self.dist:
+            raise nx.NetworkXNoPath(f"Node {target} not reachable from {source}")
+        path = [target]
+        while path[-1] != source:
+            path.append(self.pred[path[-1]][0])
+        return path[::-1], self.dist[target]
+
+
+# Single-source result from the CSR backend: pred/dist arrays indexed like csr.nodes
+class _ArrayTree:
+    def __init__(self, csr, dist, pred):
+        self.csr = csr
+        self.dist = dist
+        self.pred = pred
+
+    def path(self, source, target):
+        path = self.csr.path_to(self.pred, source, target)
+        return path, float(self.dist[self.csr.node_index(target)])
+
+
+class ShortestPathService:
+    def __init__(self):
+        self._single_source = OrderedDict() # (version, source) -> _DictTree or _ArrayTree
+        self._paths = OrderedDict() # (version, source, target) -> (path, length)
+        self._queried_sources = OrderedDict() # (version, source) seen once on a large graph
+        self._lock = threading.Lock() # Queries run on worker threads, lookups on the Tk thread
+
+    # Return (path, length) from source to target. version identifies the graph contents
+    # (see layout_cache.graph_fingerprint).
+    # Raises nx.NetworkXNoPath / nx.NodeNotFound like the networkx calls it wraps.
+    # csr (a CSRGraph of the same graph) runs the searches on arrays, checking check_cancelled.
+    def shortest_path(self, graph, version, source, target, csr=None, check_cancelled=None):
+        cached = self.cached_path(version, source, target)
+        if cached is not None:
+            return cached
+        key = (version, source)
+        if graph.number_of_nodes() > POINT_TO_POINT_NODES:
+            with self._lock:
+                repeated = key in self._queried_sources
+                self._queried_sources[key] = True
+                self._trim(self._queried_sources, PATH_CACHE_SIZE)
+            if not repeated:
+                result = self._point_to_point(graph, source, target, csr, check_cancelled)
+                with self._lock:
+                    self._paths[(version, source, target)] = result
+                    self._trim(self._paths, PATH_CACHE_SIZE)
+                return result
+        return self.single_source(graph, version, source, csr, check_cancelled).path(source, target)
+
+    # Distances and predecessors from source to every reachable node (computed once per version/source);
+    # the returned tree's path(source, target) gives (path, length) for any target
+    def single_source(self, graph, version, source, csr=None, check_cancelled=None):
+        key = (version, source)
+        with self._lock:
+            if key in self._single_source:
+                self._single_source.move_to_end(key)
+                return self._single_source[key]
+        if csr is not None:
+            tree = _ArrayTree(csr, *csr.dijkstra(source, check_cancelled=check_cancelled))
+        else:
+            tree = _DictTree(*nx.dijkstra_predecessor_and_distance(graph, source, weight='weight'))
+        with self._lock:
+            self._single_source[key] = tree
+            self._trim(self._single_source, SINGLE_SOURCE_CACHE_SIZE)
+        return tree
+
+    # (path, length) if it can be answered without searching, else None
+    def cached_path(self, version, source, target):
+        with self._lock:
+            tree = self._single_source.get((version, source))
+            if tree is None:
+                return self._paths.get((version, source, target))
+            self._single_source.move_to_end((version, source))
+        return tree.path(source, target)
+
+    # Length only, or None if not cached (or if the target is not in the cached tree's graph)
+    def cached_length(self, version, source, target):
+        try:
+            cached = self.cached_path(version, source, target)
+        except (nx.NetworkXNoPath, nx.NodeNotFound):
+            return None
+        return None if cached is None else cached[1]
+
+    @staticmethod
+    def _trim(cache, size):
+        while len(cache) > size:
+            cache.popitem(last=False)
+
+    # A search that stops at target: Dijkstra on the CSR arrays if there are any, else bidirectional Dijkstra
+    def _point_to_point(self, graph, source, target, csr=None, check_cancelled=None):
+        if csr is not None:
+            return _ArrayTree(csr, *csr.dijkstra(source, target, check_cancelled)).path(source, target)
+        return self.bidirectional(graph, source, target)
+
+    @staticmethod
+    def bidirectional(graph, source, target):
+        length, path = nx.bidirectional_dijkstra(graph, source, target, weight='weight')
+        return path, length
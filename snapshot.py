@@ -0,0 +1,274 @@
+# Binary graph snapshots: a parsed graph plus its layout in one file that reopens without parsing.
+#
+# Layout: 8-byte magic, 8-byte little-endian header length, a JSON header, then every array at a
+# 64-byte aligned offset given in the header:
+#   names      uint8 (b)    UTF-8 node names joined by "\n" (parser node IDs never contain whitespace)
+#   indptr     int64 (n+1)  CSR row offsets        \
+#   indices    int32 (2m)   CSR neighbour indices   } as in csr_graph.CSRGraph, in networkx adjacency order
+#   weights    float64 (2m) CSR weights            /
+#   has_weight uint8 (2m)   1 where the edge had a 'weight' attribute (unweighted lines have none)
+#   xy         float64 (n,2) node positions (absent if the graph had no layout yet)
+# Opening maps the file read-only and views the arrays in place, so nothing is parsed or copied
+# and sessions opening the same snapshot share its pages through the OS cache. The networkx graph
+# is rebuilt from the arrays with exactly the original adjacency order, so results, tie-breaking
+# and the fingerprint (stored in the header, not recomputed) match the graph that was saved.
+import gc
+import json
+import os
+import struct
+import tempfile
+from contextlib import contextmanager
+
+import networkx as nx
+import numpy as np
+
+from algorithms import use_csr
+from csr_graph import CSRGraph, CANCEL_CHECK_INTERVAL
+from graph_loader import ParseReport
+from pipeline import ParsedGraph, DrawArrays
+
+MAGIC = b"DAAGSNP1"
+ALIGNMENT = 64
+FORMAT_VERSION = 1
+SNAPSHOT_EXTENSION = ".gsnap"
+# Expected dtype and shape of every array; 'n' is the node count, 'k' the number of CSR slots
+ARRAY_FORMATS = {
+    'names': ('|u1', None),
+    'indptr': ('<i8', ('n+1',)),
+    'indices': ('<i4', ('k',)),
+    'weights': ('<f8', ('k',)),
+    'has_weight': ('|u1', ('k',)),
+    'xy': ('<f8', ('n', 2)),
+}
+OPTIONAL_ARRAYS = {'xy'}
+
+
+# Read once at import (setting it is process-wide): mkstemp creates files readable by the owner
+# only, and a saved snapshot should get the same permissions as any other new file
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+class SnapshotError(ValueError):
+    pass
+
+
+def _aligned(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+# Millions of new dicts/tuples would otherwise set off repeated full collections, each walking every
+# object in the process (including the previous graph); what is built here has no reference cycles
+@contextmanager
+def _gc_paused():
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+# Write parsed (and pos, if it places every node) to path. Only string node IDs, as produced by
+# the parser, can be stored.
+def save_snapshot(path, parsed, pos=None):
+    graph = parsed.graph
+    nodes = list(graph)
+    if not all(isinstance(node, str) and "\n" not in node for node in nodes):
+        raise SnapshotError("Only graphs with plain string node names can be saved as a snapshot.")
+    csr = parsed.csr if parsed.csr is not None else CSRGraph.from_networkx(graph)
+    # Same walk over graph._adj as CSRGraph.from_networkx, so the flags line up with its slots
+    has_weight = np.fromiter(('weight' in data for nbrs in graph._adj.values() for data in nbrs.values()),
+                             dtype=np.uint8, count=len(csr.indices))
+    arrays = dict(names=np.frombuffer("\n".join(nodes).encode(), dtype=np.uint8),
+                  indptr=csr.indptr, indices=csr.indices, weights=csr.weights, has_weight=has_weight)
+    if pos and len(pos) == len(nodes) and all(node in pos for node in nodes):
+        arrays['xy'] = np.array([pos[node] for node in nodes], dtype=np.float64).reshape(len(nodes), 2)
+
+    # Offsets depend on the header length and the header holds the offsets: lay the arrays out
+    # after a header size estimate and grow it until the header fits
+    header_room = 1024
+    while True:
+        offset = _aligned(len(MAGIC) + 8 + header_room)
+        table = {}
+        for name, array in arrays.items():
+            table[name] = dict(offset=offset, dtype=array.dtype.str, shape=list(array.shape))
+            offset = _aligned(offset + array.nbytes)
+        header = json.dumps(dict(format=FORMAT_VERSION, version=parsed.version, num_nodes=len(nodes),
+                                 num_edges=graph.number_of_edges(), arrays=table)).encode()
+        if len(header) <= header_room:
+            break
+        header_room = len(header)
+
+    # A private temporary file next to path: another save to the same path must not write into it
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(MAGIC + struct.pack("<Q", len(header)) + header)
+            for name, array in arrays.items():
+                f.seek(table[name]['offset'])
+                f.write(np.ascontiguousarray(array).tobytes())
+            f.truncate(offset)
+        os.chmod(tmp_path, 0o666 & ~_UMASK)
+        os.replace(tmp_path, path) # Atomic, so a crash never leaves half a snapshot
+        tmp_path = None
+    finally:
+        if tmp_path is not None:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+
+# Map path and return a GraphSnapshot viewing its arrays; raises SnapshotError for anything else
+def load_snapshot(path):
+    with open(path, 'rb') as f:
+        prefix = f.read(len(MAGIC) + 8)
+        if len(prefix) < len(MAGIC) + 8 or prefix[:len(MAGIC)] != MAGIC:
+            raise SnapshotError(f"{os.path.basename(path)} is not a graph snapshot.")
+        (header_length,) = struct.unpack("<Q", prefix[len(MAGIC):])
+        try:
+            header = json.loads(f.read(header_length))
+        except ValueError as e:
+            raise SnapshotError(f"Snapshot header is damaged: {e}") from None
+    if not isinstance(header, dict):
+        raise SnapshotError("Snapshot header is damaged.")
+    if header.get('format') != FORMAT_VERSION:
+        raise SnapshotError(f"Unsupported snapshot format {header.get('format')}.")
+
+    data = np.memmap(path, dtype=np.uint8, mode='r')
+    try:
+        num_nodes = int(header['num_nodes'])
+        int(header['num_edges'])
+        str(header['version'])
+        table = header['arrays']
+        missing = set(ARRAY_FORMATS) - OPTIONAL_ARRAYS - set(table)
+        if missing:
+            raise SnapshotError(f"Snapshot is missing arrays: {', '.join(sorted(missing))}.")
+        arrays = {}
+        for name, entry in table.items():
+            if name not in ARRAY_FORMATS:
+                continue # Written by a newer version; not needed here
+            dtype = np.dtype(entry['dtype'])
+            shape = tuple(int(dim) for dim in entry['shape'])
+            offset = int(entry['offset'])
+            if dtype.str != ARRAY_FORMATS[name][0] or min(shape + (0,)) < 0 or offset < 0 or offset % ALIGNMENT:
+                raise SnapshotError(f"Snapshot array '{name}' has an unexpected type or layout.")
+            end = offset + int(np.prod(shape, dtype=np.int64)) * dtype.itemsize
+            if end > len(data):
+                raise SnapshotError("Snapshot file is truncated.")
+            arrays[name] = data[offset:end].view(dtype).reshape(shape)
+        _check_shapes(arrays, num_nodes)
+        names = arrays['names'].tobytes().decode()
+    except SnapshotError:
+        raise
+    except (KeyError, TypeError, ValueError, AttributeError) as e:
+        raise SnapshotError(f"Snapshot header is damaged: {type(e).__name__}: {e}") from None
+    nodes = names.split("\n") if num_nodes else []
+    if len(nodes) != num_nodes:
+        raise SnapshotError("Snapshot node table does not match its header.")
+    return GraphSnapshot(header, nodes, arrays)
+
+
+# Shapes against ARRAY_FORMATS, plus what the CSR walk relies on: offsets from 0 to k, non-decreasing,
+# and every neighbour index a valid node
+def _check_shapes(arrays, num_nodes):
+    k = len(arrays['indices'])
+    sizes = {'n': num_nodes, 'n+1': num_nodes + 1, 'k': k}
+    for name, array in arrays.items():
+        expected = ARRAY_FORMATS[name][1]
+        if expected is None:
+            if array.ndim != 1:
+                raise SnapshotError(f"Snapshot array '{name}' has an unexpected shape.")
+        elif array.shape != tuple(sizes.get(dim, dim) for dim in expected):
+            raise SnapshotError(f"Snapshot array '{name}' has an unexpected shape.")
+    indptr, indices = arrays['indptr'], arrays['indices']
+    if indptr[0] != 0 or indptr[-1] != k or np.any(np.diff(indptr) < 0):
+        raise SnapshotError("Snapshot adjacency offsets are inconsistent.")
+    if k and (indices.min() < 0 or indices.max() >= num_nodes):
+        raise SnapshotError("Snapshot adjacency refers to nodes that do not exist.")
+
+
+class GraphSnapshot:
+    def __init__(self, header, nodes, arrays):
+        self.version = header['version'] # Fingerprint of the saved graph
+        self.num_edges = header['num_edges']
+        self.nodes = nodes
+        self.indptr = arrays['indptr']
+        self.indices = arrays['indices']
+        self.weights = arrays['weights']
+        self.has_weight = arrays['has_weight']
+        self.xy = arrays.get('xy') # (n, 2) or None
+        self._draw_arrays = None
+
+    @property
+    def num_nodes(self):
+        return len(self.nodes)
+
+    # CSR slots with neighbour >= row are each undirected edge once, in graph.edges() order
+    def _edge_slots(self):
+        rows = np.repeat(np.arange(self.num_nodes, dtype=np.int64), np.diff(self.indptr))
+        return rows, np.flatnonzero(self.indices >= rows)
+
+    # pipeline.DrawArrays for GraphRenderer.set_arrays() before the networkx graph exists (built once,
+    # then handed on to the rebuilt ParsedGraph)
+    def draw_arrays(self):
+        if self._draw_arrays is None:
+            rows, slots = self._edge_slots()
+            arrays = DrawArrays(self.nodes, np.column_stack((rows[slots], self.indices[slots])))
+            weighted = np.flatnonzero(self.has_weight[slots])
+            arrays.label_edges = weighted
+            arrays.label_weights = self.weights[slots[weighted]]
+            self._draw_arrays = arrays
+        return self._draw_arrays
+
+    def positions(self):
+        return None if self.xy is None else dict(zip(self.nodes, self.xy))
+
+    # CSR arrays viewed from the file, no copy
+    def csr(self):
+        return CSRGraph(self.nodes, self.indptr, self.indices, self.weights)
+
+    # Rebuild the nx.Graph with each node's neighbours in the saved order. Every edge gets one
+    # attribute dict shared by both of its slots, as networkx itself does; slot k's partner (the
+    # same edge seen from the other end) is found by matching the (row, col) and (col, row) sort orders.
+    def to_graph(self, check_cancelled=None):
+        check_cancelled = check_cancelled or (lambda: None)
+        n = self.num_nodes
+        rows = np.repeat(np.arange(n, dtype=np.int64), np.diff(self.indptr))
+        cols = self.indices.astype(np.int64)
+        partner = np.empty(len(cols), dtype=np.int64)
+        partner[np.argsort(cols * n + rows)] = np.argsort(rows * n + cols)
+        check_cancelled()
+        forward = np.flatnonzero(cols >= rows)
+        backward = np.flatnonzero(cols < rows)
+        data = np.empty(len(cols), dtype=object)
+        data[forward] = [{'weight': w} if flag else {}
+                         for w, flag in zip(self.weights[forward].tolist(), self.has_weight[forward].tolist())]
+        data[backward] = data[partner[backward]]
+        data = data.tolist()
+        neighbours = np.array(self.nodes, dtype=object)[cols].tolist()
+        check_cancelled()
+
+        graph = nx.Graph()
+        graph.add_nodes_from(self.nodes)
+        adj = graph._adj
+        bounds = self.indptr.tolist()
+        for i, u in enumerate(self.nodes):
+            if i % CANCEL_CHECK_INTERVAL == 0:
+                check_cancelled()
+            start, end = bounds[i], bounds[i + 1]
+            adj[u].update(zip(neighbours[start:end], data[start:end]))
+        return graph
+
+    # The ParsedGraph a parse of the original input would have given (with an empty parse report)
+    def to_parsed(self, check_cancelled=None):
+        with _gc_paused():
+            graph = self.to_graph(check_cancelled)
+            arrays = self.draw_arrays()
+            nodes = self.nodes
+            labelled = arrays.edge_endpoints[arrays.label_edges].tolist()
+            edge_labels = {(nodes[u], nodes[v]): w for (u, v), w in zip(labelled, arrays.label_weights.tolist())}
+            csr = self.csr() if use_csr(graph) else None
+        return ParsedGraph(graph, edge_labels, ParseReport(), self.version, csr, arrays)
@@ -0,0 +1,110 @@
+# Collapsible "Stats" panel: a table of the latest run's stages from instrumentation.py
+# (time, calls, allocations, details such as artist counts), plus switches for memory
+# tracing and the JSONL trace file. It polls the Instrumentation only while it is open.
+import os
+import tkinter as tk
+from tkinter import ttk, filedialog
+
+REFRESH_MS = 500
+COLUMNS = [("calls", "Calls", 50), ("ms", "Time (ms)", 80), ("max_ms", "Max (ms)", 80),
+           ("alloc", "Alloc peak (MiB)", 110), ("details", "Details", 360)]
+
+
+def _format_details(details):
+    return ", ".join(f"{key}={value}" for key, value in details.items() if key != 'thread')
+
+
+class StatsPanel:
+    def __init__(self, parent, instrumentation):
+        self.instrumentation = instrumentation
+        self.frame = ttk.Frame(parent)
+        self.toggle_button = ttk.Button(self.frame, text="Show Stats", command=self.toggle)
+        self.toggle_button.grid(row=0, column=0, sticky=tk.W)
+        self.run_label = ttk.Label(self.frame, text="")
+        self.run_label.grid(row=0, column=1, sticky=tk.W, padx=5)
+
+        # --- Body (hidden until toggled) --- #
+        self.body = ttk.Frame(self.frame)
+        self.body.columnconfigure(0, weight=1)
+        self.tree = ttk.Treeview(self.body, columns=[name for name, _, _ in COLUMNS], height=7)
+        self.tree.heading("#0", text="Stage")
+        self.tree.column("#0", width=150, stretch=False)
+        for name, title, width in COLUMNS:
+            self.tree.heading(name, text=title)
+            self.tree.column(name, width=width, stretch=(name == "details"),
+                             anchor=tk.W if name == "details" else tk.E)
+        self.tree.grid(row=0, column=0, columnspan=3, sticky="ew")
+
+        self.memory_var = tk.BooleanVar(value=instrumentation.trace_memory)
+        ttk.Checkbutton(self.body, text="Trace allocations (slower)", variable=self.memory_var,
+                        command=self.on_memory_toggled).grid(row=1, column=0, sticky=tk.W)
+        self.trace_button = ttk.Button(self.body, command=self.on_trace_clicked)
+        self.trace_button.grid(row=1, column=1, sticky=tk.E)
+        self.trace_label = ttk.Label(self.body)
+        self.trace_label.grid(row=1, column=2, sticky=tk.W, padx=5)
+        self._update_trace_widgets()
+
+        self.visible = False
+        self._shown = None # (run id, row count) currently in the table
+        self._after_id = None
+
+    def grid(self, **kwargs):
+        self.frame.grid(**kwargs)
+
+    def toggle(self):
+        self.visible = not self.visible
+        if self.visible:
+            self.body.grid(row=1, column=0, columnspan=2, sticky="ew")
+            self.toggle_button.config(text="Hide Stats")
+            self._shown = None
+            self._poll()
+        else:
+            self.body.grid_remove()
+            self.toggle_button.config(text="Show Stats")
+            if self._after_id is not None:
+                self.frame.after_cancel(self._after_id)
+                self._after_id = None
+
+    def _poll(self):
+        self._after_id = None
+        if not self.visible:
+            return
+        self.refresh()
+        self._after_id = self.frame.after(REFRESH_MS, self._poll)
+
+    def refresh(self):
+        rows = self.instrumentation.summary()
+        state = (self.instrumentation.run_id, sum(row['calls'] for row in rows))
+        if state == self._shown:
+            return
+        self._shown = state
+        self.tree.delete(*self.tree.get_children())
+        for row in rows:
+            alloc = "" if row['alloc_peak'] is None else f"{row['alloc_peak'] / 2**20:.1f}"
+            self.tree.insert("", tk.END, text=row['stage'],
+                             values=(row['calls'], f"{row['seconds'] * 1000:.1f}", f"{row['max_seconds'] * 1000:.1f}",
+                                     alloc, _format_details(row['details'])))
+        info = self.instrumentation.run_info()
+        described = ", ".join(f"{key}={value}" for key, value in info.items() if key != 'started' and value)
+        total = sum(row['seconds'] for row in rows)
+        self.run_label.config(text=f"Run {self.instrumentation.run_id}: {described} (stages total {total:.2f} s)"
+                              if rows else "")
+
+    def on_memory_toggled(self):
+        self.instrumentation.trace_memory = self.memory_var.get()
+
+    def on_trace_clicked(self):
+        if self.instrumentation.trace_path is not None:
+            self.instrumentation.set_trace_file(None)
+        else:
+            path = filedialog.asksaveasfilename(title="Write Stage Trace", defaultextension=".jsonl",
+                                                filetypes=[("JSON lines", "*.jsonl"), ("All files", "*.*")])
+            if not path:
+                return
+            self.instrumentation.set_trace_file(path)
+        self._update_trace_widgets()
+
+    def _update_trace_widgets(self):
+        path = self.instrumentation.trace_path
+        self.trace_button.config(text="Stop Trace File" if path else "Trace to File...")
+        self.trace_label.config(text=f"Tracing to {os.path.basename(path)}" if path else "")
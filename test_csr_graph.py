@@ -0,0 +1,80 @@
+# The CSR backend must give exactly the networkx backend's results (edges, order and tie-breaking),
+# since which one runs depends only on the graph's size.
+import random
+
+import networkx as nx
+import pytest
+
+from algorithms import run_graph_algorithm, BACKEND_NETWORKX, BACKEND_CSR
+
+
+def _random_graph(seed, nodes=40, edges=90):
+    rng = random.Random(seed)
+    graph = nx.Graph()
+    while graph.number_of_edges() < edges:
+        u, v = rng.randrange(nodes), rng.randrange(nodes)
+        # Few distinct weights, so equal-length paths and equal-weight edges are common
+        graph.add_edge(str(u), str(v), weight=float(rng.randint(1, 4)))
+    return graph
+
+
+def _both(graph, algorithm, source=None, target=None):
+    return (run_graph_algorithm(graph, algorithm, source, target, backend=BACKEND_NETWORKX),
+            run_graph_algorithm(graph, algorithm, source, target, backend=BACKEND_CSR))
+
+
+@pytest.mark.parametrize("seed", range(60))
+@pytest.mark.parametrize("algorithm", ["BFS", "DFS", "Kruskal", "Prim"])
+def test_edges_match_networkx(seed, algorithm):
+    graph = _random_graph(seed)
+    expected, actual = _both(graph, algorithm, next(iter(graph)))
+    assert actual == expected
+
+
+@pytest.mark.parametrize("seed", range(300))
+def test_dijkstra_path_matches_networkx(seed):
+    graph = _random_graph(seed)
+    nodes = list(graph)
+    source, target = nodes[0], nodes[-1]
+    try:
+        expected = nx.dijkstra_path(graph, source, target)
+    except nx.NetworkXNoPath:
+        with pytest.raises(nx.NetworkXNoPath):
+            run_graph_algorithm(graph, "Dijkstra", source, target, backend=BACKEND_CSR)
+        return
+    assert _both(graph, "Dijkstra", source, target) == (expected, expected)
+
+
+def test_nan_weights_skipped_by_both_backends():
+    graph = _random_graph(7)
+    u, v = next(iter(graph.edges()))
+    graph[u][v]['weight'] = float('nan')
+    for algorithm in ("Kruskal", "Prim"):
+        expected, actual = _both(graph, algorithm, next(iter(graph)))
+        assert actual == expected
+        assert (u, v) not in expected and (v, u) not in expected
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_negative_weights_match_networkx(seed):
+    graph = _random_graph(seed)
+    rng = random.Random(seed)
+    for u, v in rng.sample(list(graph.edges()), 3):
+        graph[u][v]['weight'] = -float(rng.randint(1, 4))
+    nodes = list(graph)
+    source, target = nodes[0], nodes[-1]
+    try:
+        expected = nx.dijkstra_path(graph, source, target)
+    except (ValueError, nx.NetworkXNoPath) as e:
+        with pytest.raises(type(e)):
+            run_graph_algorithm(graph, "Dijkstra", source, target, backend=BACKEND_CSR)
+        return
+    assert run_graph_algorithm(graph, "Dijkstra", source, target, backend=BACKEND_CSR) == expected
+
+
+def test_negative_edge_on_path_raises_like_networkx():
+    graph = nx.Graph()
+    graph.add_weighted_edges_from([("A", "B", 1.0), ("B", "C", -3.0), ("C", "D", 1.0)])
+    for backend in (BACKEND_NETWORKX, BACKEND_CSR):
+        with pytest.raises(ValueError, match="negative weights"):
+            run_graph_algorithm(graph, "Dijkstra", "A", "D", backend=backend)
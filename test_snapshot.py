@@ -0,0 +1,250 @@
+# A snapshot must reopen as the graph that was saved: same adjacency order (results and tie-breaking
+# depend on it), weights, edge labels, fingerprint and layout. Damaged files must raise SnapshotError,
+# never IndexError or a crash further down while drawing.
+import json
+import random
+import struct
+
+import numpy as np
+import pytest
+
+import snapshot
+from csr_graph import CSRGraph
+from layout_cache import graph_fingerprint
+from pipeline import parse_graph
+from snapshot import MAGIC, SnapshotError, load_snapshot, save_snapshot
+
+
+# Node names out of sorted order, repeated and reversed edges, and lines with and without a weight
+def _parsed(seed=0, nodes=30, edges=80):
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(edges):
+        u, v = rng.randrange(nodes), rng.randrange(nodes)
+        weight = f" {rng.choice(['1', '2.5', '4', '-1', '0'])}" if rng.random() < 0.7 else ""
+        lines.append(f"n{u * 7 % nodes} n{v * 7 % nodes}{weight}")
+    lines.append("lonely_a lonely_b")
+    return parse_graph(chunks=["\n".join(lines) + "\n"])
+
+
+def _layout(graph, seed=0):
+    rng = np.random.default_rng(seed)
+    return {node: rng.normal(size=2) for node in graph}
+
+
+def _label_set(edge_labels):
+    return {frozenset(edge): weight for edge, weight in edge_labels.items()}
+
+
+# The labels a graph should be drawn with. Not the parser's edge_labels: an edge given as both (u, v)
+# and (v, u) is in there twice, while the graph kept the weight of the later line.
+def _weights(graph):
+    return {frozenset((u, v)): data['weight'] for u, v, data in graph.edges(data=True) if 'weight' in data}
+
+
+@pytest.fixture
+def saved(tmp_path):
+    parsed = _parsed()
+    pos = _layout(parsed.graph)
+    path = tmp_path / "graph.gsnap"
+    save_snapshot(str(path), parsed, pos)
+    return parsed, pos, path
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_round_trip_keeps_graph(tmp_path, seed):
+    parsed = _parsed(seed)
+    path = tmp_path / "graph.gsnap"
+    save_snapshot(str(path), parsed, _layout(parsed.graph, seed))
+    loaded = load_snapshot(str(path)).to_parsed()
+    original, graph = parsed.graph, loaded.graph
+    assert list(graph) == list(original)
+    for node in original:
+        # Neighbour order, weights, and which edges have no weight attribute at all
+        assert list(graph.adj[node].items()) == list(original.adj[node].items())
+    assert list(graph.edges(data=True)) == list(original.edges(data=True))
+    for u, v in graph.edges():
+        assert graph[u][v] is graph[v][u]
+    assert _label_set(loaded.edge_labels) == _weights(original)
+    assert loaded.version == parsed.version == graph_fingerprint(graph)
+
+
+def test_round_trip_keeps_positions(saved):
+    parsed, pos, path = saved
+    loaded = load_snapshot(str(path))
+    assert loaded.num_nodes == parsed.graph.number_of_nodes()
+    assert loaded.num_edges == parsed.graph.number_of_edges()
+    positions = loaded.positions()
+    assert list(positions) == list(parsed.graph)
+    for node, xy in pos.items():
+        assert positions[node].tolist() == xy.tolist()
+
+
+def test_draw_arrays_match_graph(saved):
+    parsed, _, path = saved
+    arrays = load_snapshot(str(path)).draw_arrays()
+    nodes = arrays.nodes
+    assert [(nodes[u], nodes[v]) for u, v in arrays.edge_endpoints.tolist()] == list(parsed.graph.edges())
+    labelled = {frozenset((nodes[u], nodes[v])): weight for (u, v), weight
+                in zip(arrays.edge_endpoints[arrays.label_edges].tolist(), arrays.label_weights.tolist())}
+    assert labelled == _weights(parsed.graph)
+
+
+def test_csr_matches_graph(saved, monkeypatch):
+    parsed, _, path = saved
+    monkeypatch.setattr(snapshot, "use_csr", lambda graph: True)
+    csr = load_snapshot(str(path)).to_parsed().csr
+    expected = CSRGraph.from_networkx(parsed.graph)
+    assert csr.nodes == expected.nodes
+    for name in ("indptr", "indices", "weights"):
+        assert np.array_equal(getattr(csr, name), getattr(expected, name))
+
+
+@pytest.mark.parametrize("partial", [False, True])
+def test_layout_is_optional(tmp_path, partial):
+    parsed = _parsed()
+    pos = dict(list(_layout(parsed.graph).items())[:5]) if partial else None
+    path = tmp_path / "graph.gsnap"
+    save_snapshot(str(path), parsed, pos)
+    loaded = load_snapshot(str(path))
+    assert loaded.xy is None and loaded.positions() is None
+    assert list(loaded.to_graph().edges(data=True)) == list(parsed.graph.edges(data=True))
+
+
+def test_empty_graph(tmp_path):
+    parsed = parse_graph(chunks=[""])
+    path = tmp_path / "empty.gsnap"
+    save_snapshot(str(path), parsed, {})
+    loaded = load_snapshot(str(path)).to_parsed()
+    assert loaded.graph.number_of_nodes() == 0
+    assert loaded.version == parsed.version
+
+
+def test_non_string_nodes_rejected(tmp_path):
+    parsed = _parsed()
+    parsed.graph.add_edge(1, 2)
+    with pytest.raises(SnapshotError):
+        save_snapshot(str(tmp_path / "graph.gsnap"), parsed)
+
+
+# --- Damaged files --- #
+def _header(raw):
+    (length,) = struct.unpack("<Q", raw[len(MAGIC):len(MAGIC) + 8])
+    return json.loads(raw[len(MAGIC) + 8:len(MAGIC) + 8 + length])
+
+
+# Replace the header in place; the arrays stay where they were (save_snapshot leaves room after it)
+def _with_header(raw, header):
+    data = json.dumps(header).encode()
+    first_array = min(entry['offset'] for entry in _header(raw)['arrays'].values())
+    assert len(MAGIC) + 8 + len(data) <= first_array
+    start = len(MAGIC) + 8 + len(data)
+    return raw[:len(MAGIC)] + struct.pack("<Q", len(data)) + data + raw[start:]
+
+
+def _damaged(path, raw):
+    path.write_bytes(raw)
+    with pytest.raises(SnapshotError):
+        load_snapshot(str(path))
+
+
+@pytest.mark.parametrize("fraction", [0.0, 0.01, 0.5, 0.9])
+def test_truncated_file_raises(saved, fraction):
+    _, _, path = saved
+    raw = path.read_bytes()
+    _damaged(path, raw[:int(len(raw) * fraction)])
+
+
+def test_truncated_header_raises(saved):
+    _, _, path = saved
+    raw = path.read_bytes()
+    _damaged(path, raw[:len(MAGIC) + 20])
+
+
+def test_wrong_magic_raises(saved):
+    _, _, path = saved
+    raw = path.read_bytes()
+    _damaged(path, b"NOTSNAP!" + raw[len(MAGIC):])
+
+
+def test_garbled_header_raises(saved):
+    _, _, path = saved
+    raw = bytearray(path.read_bytes())
+    raw[len(MAGIC) + 8] = ord("#")
+    _damaged(path, bytes(raw))
+
+
+def _set(*keys_and_value):
+    *keys, last, value = keys_and_value
+
+    def mutate(header):
+        for key in keys:
+            header = header[key]
+        header[last] = value
+    return mutate
+
+
+def _drop(*keys):
+    *keys, last = keys
+
+    def mutate(header):
+        for key in keys:
+            header = header[key]
+        del header[last]
+    return mutate
+
+
+@pytest.mark.parametrize("mutate", [
+    _set('format', 99),
+    _drop('arrays'),
+    _set('arrays', [1]),
+    _drop('arrays', 'indptr'),
+    _drop('arrays', 'names'),
+    _drop('num_nodes'),
+    _set('num_nodes', "x"),
+    _set('num_nodes', None),
+    _set('num_nodes', 5),
+    _drop('num_edges'),
+    _set('arrays', 'indices', 'dtype', '<f8'),
+    _set('arrays', 'names', 'dtype', 5),
+    _set('arrays', 'weights', 'shape', [3]),
+    _set('arrays', 'indices', 'shape', "ab"),
+    _set('arrays', 'indices', 'shape', [-1]),
+    _set('arrays', 'xy', 'shape', [2, 2]),
+    _set('arrays', 'indices', 'offset', 10 ** 9),
+    _set('arrays', 'indices', 'offset', -64),
+    _set('arrays', 'indices', 'offset', 1),
+    _drop('arrays', 'weights', 'offset'),
+])
+def test_damaged_header_raises(saved, mutate):
+    _, _, path = saved
+    raw = path.read_bytes()
+    header = _header(raw)
+    mutate(header)
+    _damaged(path, _with_header(raw, header))
+
+
+@pytest.mark.parametrize("name, index, value", [
+    ('indptr', 0, 5), # Offsets must start at 0...
+    ('indptr', -1, 3), # ...end at the number of slots...
+    ('indptr', 3, 10 ** 6), # ...and never decrease
+    ('indices', 0, -1), # Neighbours must be nodes
+    ('indices', 0, 10 ** 6),
+])
+def test_damaged_arrays_raise(saved, name, index, value):
+    _, _, path = saved
+    raw = bytearray(path.read_bytes())
+    entry = _header(bytes(raw))['arrays'][name]
+    array = np.frombuffer(raw, dtype=entry['dtype'], count=int(np.prod(entry['shape'])), offset=entry['offset']).copy()
+    array[index] = value
+    raw[entry['offset']:entry['offset'] + array.nbytes] = array.tobytes()
+    _damaged(path, bytes(raw))
+
+
+def test_extra_node_names_raise(saved):
+    _, _, path = saved
+    raw = bytearray(path.read_bytes())
+    entry = _header(bytes(raw))['arrays']['names']
+    start = entry['offset']
+    raw[start:start + 1] = b"\n" # The first name splits in two
+    _damaged(path, bytes(raw))